@@ -3,10 +3,12 @@ Enhanced Agent Base Module
 Provides an improved base class for all MCP agents with additional capabilities
 """
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional, Set
+from typing import Dict, List, Any, Optional, Set, Deque
+from collections import deque
 import asyncio
 import json
 import uuid
+import time
 import logging
 from datetime import datetime
 
@@ -16,6 +18,8 @@ logger = logging.getLogger('mcp.agents')
 class AgentMetadata:
     """Metadata for agent capabilities and requirements"""
     
+    __slots__ = ("name", "description", "version", "required_tools", "capabilities")
+    
     def __init__(self, 
                  name: str,
                  description: str,
@@ -53,11 +57,13 @@ class AgentMetadata:
 class AgentMemory:
     """Memory store for agent state between runs"""
     
+    __slots__ = ("agent_id", "data", "context", "history")
+    
     def __init__(self, agent_id: str):
         self.agent_id = agent_id
         self.data: Dict[str, Any] = {}
         self.context: Dict[str, Any] = {}
-        self.history: List[Dict[str, Any]] = []
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=100)
     
     def store(self, key: str, value: Any) -> None:
         """Store a value in memory"""
@@ -73,24 +79,29 @@ class AgentMemory:
     
     def add_to_history(self, entry_type: str, data: Dict[str, Any]) -> None:
         """Add an entry to history"""
+        # Timestamps are stored as epoch nanoseconds and formatted on read
         entry = {
             "type": entry_type,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time_ns(),
             "data": data
         }
+        # History is capped at a reasonable size by the deque
         self.history.append(entry)
-        
-        # Keep history at a reasonable size
-        if len(self.history) > 100:
-            self.history.pop(0)
     
     def get_history(self, entry_type: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
         """Get history entries, optionally filtered by type"""
         if entry_type:
-            filtered = [e for e in self.history if e["type"] == entry_type]
-            return filtered[-limit:]
+            entries = [e for e in self.history if e["type"] == entry_type][-limit:]
         else:
-            return self.history[-limit:]
+            entries = list(self.history)[-limit:]
+        
+        return [self._format_entry(e) for e in entries]
+    
+    @staticmethod
+    def _format_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of a history entry with an ISO formatted timestamp"""
+        timestamp = datetime.fromtimestamp(entry["timestamp"] / 1e9).isoformat()
+        return {**entry, "timestamp": timestamp}
 
 
 class Agent(ABC):
@@ -110,6 +121,8 @@ class Agent(ABC):
         self.memory = AgentMemory(self.id)
         self.tools = {}
         self._dependencies_checked = False
+        # Resolve async support once rather than probing on every run
+        self._execute_async_impl = getattr(type(self), '_execute_async', None)
     
     @abstractmethod
     def _initialize_metadata(self) -> AgentMetadata:
@@ -129,7 +142,7 @@ class Agent(ABC):
                 missing_tools.append(tool_name)
         
         if missing_tools:
-            logger.warning(f"Agent {self.metadata.name} is missing required tools: {', '.join(missing_tools)}")
+            logger.warning("Agent %s is missing required tools: %s", self.metadata.name, ', '.join(missing_tools))
             return False
         
         self._dependencies_checked = True
@@ -182,11 +195,11 @@ class Agent(ABC):
             self.memory.add_to_history("run", {"input": input_text})
             
             # Check if agent implements async execution
-            if hasattr(self, '_execute_async') and callable(getattr(self, '_execute_async')):
+            if self._execute_async_impl is not None:
                 result = await self._execute_async(input_text)
             else:
                 # Fall back to synchronous execution in a thread
-                loop = asyncio.get_event_loop()
+                loop = asyncio.get_running_loop()
                 result = await loop.run_in_executor(None, self._execute, input_text)
             
             # Update history with result
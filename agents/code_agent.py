@@ -1,19 +1,70 @@
+import atexit
+import io
 import os
 import re
 import time
 import asyncio
-import json
-from typing import Dict, List, Any, Optional
+import functools
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 
 from agents.base import Agent, AgentMetadata
-from tools.file_tool import FileTool
-from llm.ollama_wrapper import OllamaLLM
 from utils.logger import log_event
+from utils import json_utils
 
 # Configure logging
 logger = logging.getLogger('mcp.agents.code')
 
+# Precompiled patterns for mode detection
+_RE_NEW_PROJECT = re.compile(r'create\s+(?:a\s+)?(?:new\s+)?project')
+_RE_ADD_FILE = re.compile(r'add\s+(?:a\s+)?(?:new\s+)?file')
+_RE_MODIFY = re.compile(r'modify|change|update|edit')
+_RE_FILE = re.compile(r'file')
+_RE_EXECUTE = re.compile(r'run|execute|test')
+_RE_CODE = re.compile(r'code|script|program')
+
+# Language keywords and their file extensions, in priority order
+_EXTENSION_KEYWORDS = (
+    ("python", ".py"),
+    ("py", ".py"),
+    ("html", ".html"),
+    ("javascript", ".js"),
+    ("js", ".js"),
+    ("bash", ".sh"),
+    ("shell", ".sh"),
+    ("json", ".json"),
+    ("java", ".java"),
+    ("c++", ".cpp"),
+    ("cpp", ".cpp"),
+    ("c#", ".cs"),
+    ("typescript", ".ts"),
+    ("ts", ".ts"),
+)
+_EXTENSION_MAP = {
+    keyword: (priority, ext) for priority, (keyword, ext) in enumerate(_EXTENSION_KEYWORDS)
+}
+_RE_TOKEN = re.compile(r'[\w+#]+')
+
+# Runs of non-word characters replaced in safe names
+_RE_NON_WORD = re.compile(r'\W+')
+
+# Translation table for ASCII safe names: word characters are lowercased and
+# everything else becomes a NUL separator, so ASCII names take a C-level pass
+_SAFE_NAME_BYTES_TABLE = bytes(
+    ord(chr(c).lower()) if chr(c).isascii() and (chr(c).isalnum() or c == ord("_")) else 0
+    for c in range(256)
+)
+
+def _safe_name(text: str) -> str:
+    """Lowercase text, replace runs of non-word characters with '_' and strip '_' from the ends"""
+    if text.isascii():
+        translated = text.encode("ascii").translate(_SAFE_NAME_BYTES_TABLE)
+        return b"_".join(part for part in translated.split(b"\0") if part).decode("ascii").strip("_")
+    return _RE_NON_WORD.sub("_", text.lower()).strip("_")
+
+# Append-only log of files added to a project since project_info.json was last written
+_PROJECT_FILES_LOG = "project_info.files.jsonl"
+
 class CodeAgent(Agent):
     """
     Enhanced code generation agent with improved capabilities
@@ -26,10 +77,15 @@ class CodeAgent(Agent):
     """
     
     def __init__(self, llm_model: str = "deepseek-coder"):
+        # Imported here so only processes that use this agent pay for them
+        from tools.file_tool import FileTool
+        from llm.ollama_wrapper import OllamaLLM
+        
         super().__init__()
         self.file_tool = FileTool()
         self.llm = OllamaLLM(llm_model)
         self.current_project = None
+        self._compact_at_exit = False
     
     def _initialize_metadata(self) -> AgentMetadata:
         """Initialize agent metadata"""
@@ -48,61 +104,63 @@ class CodeAgent(Agent):
     
     def _execute(self, input_text: str) -> str:
         """Execute agent logic for code generation"""
-        logger.info(f"[CodeAgent] Generating code for: {input_text}")
+        logger.info("[CodeAgent] Generating code for: %s", input_text)
         
-        # Parse input to determine mode
-        mode = self._detect_mode(input_text)
+        # Parse input to determine mode; the lowercased text is reused by the handlers
+        input_lower = input_text.lower()
+        mode = self._detect_mode(input_lower)
         
         if mode == "new_project":
-            return self._create_new_project(input_text)
+            return self._create_new_project(input_text, input_lower)
         elif mode == "add_file":
-            return self._add_file_to_project(input_text)
+            return self._add_file_to_project(input_text, input_lower)
         elif mode == "modify_file":
             return self._modify_file(input_text)
         elif mode == "execute_code":
             return self._execute_code(input_text)
         else:
-            return self._create_single_file(input_text)
+            return self._create_single_file(input_text, input_lower)
     
     async def _execute_async(self, input_text: str) -> str:
         """Execute agent logic asynchronously"""
-        logger.info(f"[CodeAgent] Generating code asynchronously for: {input_text}")
+        logger.info("[CodeAgent] Generating code asynchronously for: %s", input_text)
         
-        # Parse input to determine mode
-        mode = self._detect_mode(input_text)
+        # Parse input to determine mode; the lowercased text is reused by the handlers
+        input_lower = input_text.lower()
+        mode = self._detect_mode(input_lower)
         
         # Since LLM generation might be slow, do it asynchronously
-        loop = asyncio.get_event_loop()
+        loop = asyncio.get_running_loop()
         
         if mode == "new_project":
-            return await loop.run_in_executor(None, self._create_new_project, input_text)
+            return await loop.run_in_executor(None, self._create_new_project, input_text, input_lower)
         elif mode == "add_file":
-            return await loop.run_in_executor(None, self._add_file_to_project, input_text)
+            return await loop.run_in_executor(None, self._add_file_to_project, input_text, input_lower)
         elif mode == "modify_file":
             return await loop.run_in_executor(None, self._modify_file, input_text)
         elif mode == "execute_code":
             return await loop.run_in_executor(None, self._execute_code, input_text)
         else:
-            return await loop.run_in_executor(None, self._create_single_file, input_text)
+            return await loop.run_in_executor(None, self._create_single_file, input_text, input_lower)
     
-    def _detect_mode(self, input_text: str) -> str:
-        """Detect the operation mode from input text"""
-        input_lower = input_text.lower()
-        
-        if re.search(r'create\s+(?:a\s+)?(?:new\s+)?project', input_lower):
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _detect_mode(input_lower: str) -> str:
+        """Detect the operation mode from lowercased input text (memoized)"""
+        if _RE_NEW_PROJECT.search(input_lower):
             return "new_project"
-        elif re.search(r'add\s+(?:a\s+)?(?:new\s+)?file', input_lower):
+        elif _RE_ADD_FILE.search(input_lower):
             return "add_file"
-        elif re.search(r'modify|change|update|edit', input_lower) and re.search(r'file', input_lower):
+        elif _RE_MODIFY.search(input_lower) and _RE_FILE.search(input_lower):
             return "modify_file"
-        elif re.search(r'run|execute|test', input_lower) and re.search(r'code|script|program', input_lower):
+        elif _RE_EXECUTE.search(input_lower) and _RE_CODE.search(input_lower):
             return "execute_code"
         else:
             return "single_file"
     
-    def _create_new_project(self, input_text: str) -> str:
+    def _create_new_project(self, input_text: str, input_lower: str) -> str:
         """Create a new project with multiple files"""
-        logger.info(f"[CodeAgent] Creating new project: {input_text}")
+        logger.info("[CodeAgent] Creating new project: %s", input_text)
         
         # Extract project requirements
         prompt = f"""
@@ -138,16 +196,17 @@ class CodeAgent(Agent):
             json_str = json_match.group(1) if json_match else response
             
             # Parse project structure
-            project_data = json.loads(json_str)
+            project_data = json_utils.loads(json_str)
             
             # Create project folder
             project_name = project_data.get("project_name", "untitled_project")
-            safe_project_name = re.sub(r'\W+', '_', project_name.lower()).strip('_')
+            safe_project_name = _safe_name(project_name)
             timestamp = time.strftime("%Y%m%d_%H%M")
             base_dir = "generated"
             
             project_folder = os.path.join(base_dir, f"project_{timestamp}_{safe_project_name}")
             os.makedirs(project_folder, exist_ok=True)
+            created_dirs = {project_folder}
             
             # Store project metadata
             project_info = {
@@ -159,8 +218,9 @@ class CodeAgent(Agent):
                 "setup_instructions": project_data.get("setup_instructions", "")
             }
             
-            # Create each file in the project
+            # Collect each file in the project so they can be written together
             files_created = []
+            files_to_write: List[Tuple[str, str]] = []
             for file_info in project_data.get("files", []):
                 file_path = file_info.get("path", "")
                 file_content = file_info.get("content", "")
@@ -168,45 +228,40 @@ class CodeAgent(Agent):
                 # Create full path
                 full_path = os.path.join(project_folder, file_path)
                 
-                # Ensure directory exists
-                os.makedirs(os.path.dirname(full_path), exist_ok=True)
-                
-                # Write file
-                self.file_tool.execute(
-                    action="write",
-                    path=full_path,
-                    content=file_content
-                )
+                # Ensure directory exists (once per unique directory)
+                file_dir = os.path.dirname(full_path)
+                if file_dir not in created_dirs:
+                    os.makedirs(file_dir, exist_ok=True)
+                    created_dirs.add(file_dir)
                 
+                files_to_write.append((full_path, file_content))
                 files_created.append(file_path)
                 project_info["files"].append({
                     "path": file_path,
                     "description": file_info.get("description", "")
                 })
             
-            # Save project info
-            self.file_tool.execute(
-                action="write",
-                path=os.path.join(project_folder, "project_info.json"),
-                content=json.dumps(project_info, indent=2)
-            )
+            # Save project info, original prompt and raw LLM output
+            files_to_write.extend([
+                (os.path.join(project_folder, "project_info.json"), json_utils.dumps(project_info, indent=True)),
+                (os.path.join(project_folder, "prompt.txt"), input_text),
+                (os.path.join(project_folder, "output.md"), response)
+            ])
             
-            # Save original prompt and raw LLM output
-            self.file_tool.execute(
-                action="write",
-                path=os.path.join(project_folder, "prompt.txt"),
-                content=input_text
-            )
+            # Write all project files
+            self._write_files(project_folder, files_to_write)
             
-            self.file_tool.execute(
-                action="write",
-                path=os.path.join(project_folder, "output.md"),
-                content=response
-            )
+            # Index project files for later lookups by name
+            self.memory.store("file_index", {
+                "project": project_folder,
+                "files": {
+                    os.path.relpath(path, project_folder).lower(): path
+                    for path, _ in files_to_write
+                }
+            })
             
             # Update agent memory with current project
-            self.current_project = project_folder
-            self.memory.store("current_project", project_folder)
+            self._set_current_project(project_folder)
             
             # Add project to memory's project history
             if not self.memory.has_key("project_history"):
@@ -238,26 +293,49 @@ Setup Instructions:
 """
         
         except Exception as e:
-            logger.error(f"[CodeAgent] Error creating project: {str(e)}")
+            logger.error("[CodeAgent] Error creating project: %s", e)
             # Fallback to single file creation if project creation fails
-            return self._create_single_file(input_text)
+            return self._create_single_file(input_text, input_lower)
     
-    def _create_single_file(self, input_text: str) -> str:
-        """Create a single file (original behavior)"""
-        logger.info(f"[CodeAgent] Creating single file for: {input_text}")
-        
-        # Step 1: Send prompt to model
-        prompt = f"Write code to: {input_text}"
-        full_response = self.llm.generate(prompt)
+    def _write_files(self, base: str, files: List[Tuple[str, str]]) -> None:
+        """
+        Write several (path, content) pairs under base with one batched FileTool call
         
-        # Step 2: Extract code block (clean version)
-        code = self._extract_code_block(full_response)
+        The directories must exist already; FileTool writes the files
+        concurrently on its pool.
+        """
+        if not files:
+            return
         
-        # Step 3: Detect file extension from task
-        ext = self._detect_extension(input_text)
+        self.file_tool.execute(
+            action="write_batch",
+            path=base,
+            files={os.path.relpath(path, base): content for path, content in files},
+            make_dirs=False
+        )
+    
+    def _create_single_file(self, input_text: str, input_lower: str) -> str:
+        """Create a single file (original behavior)"""
+        logger.info("[CodeAgent] Creating single file for: %s", input_text)
         
-        # Step 4: Create folder for this task
+        # Step 1: Create folder for this task
         folder = self._create_task_folder(input_text)
+        
+        # Step 2: Stream model output straight to output.md, keeping one
+        # in-memory copy for code block extraction
+        prompt = f"Write code to: {input_text}"
+        output_path = os.path.join(folder, "output.md")
+        buffer = io.StringIO()
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            for chunk in self.llm.generate_stream(prompt):
+                output_file.write(chunk)
+                buffer.write(chunk)
+        
+        # Step 3: Extract code block (clean version)
+        code = self._extract_code_block(buffer.getvalue())
+        
+        # Step 4: Detect file extension from task
+        ext = self._detect_extension(input_lower)
         filename = f"{folder}/main{ext}"
         
         # Step 5: Save code to main file
@@ -267,30 +345,24 @@ Setup Instructions:
             content=code
         )
         
-        # Step 6: Save prompt + raw output
+        # Step 6: Save prompt
         self.file_tool.execute(
             action="write",
             path=os.path.join(folder, "prompt.txt"),
             content=input_text
         )
-        self.file_tool.execute(
-            action="write",
-            path=os.path.join(folder, "output.md"),
-            content=full_response
-        )
         
         # Update agent memory
-        self.current_project = folder
-        self.memory.store("current_project", folder)
+        self._set_current_project(folder)
         
         # Log event
         log_message = f"Saved to {filename}"
-        logger.info(f"[CodeAgent] {log_message}")
+        logger.info("[CodeAgent] %s", log_message)
         log_event("CodeAgent", input_text, log_message)
         
         return f"[CodeAgent] Generated code and saved to {filename}"
     
-    def _add_file_to_project(self, input_text: str) -> str:
+    def _add_file_to_project(self, input_text: str, input_lower: str) -> str:
         """Add a new file to an existing project"""
         # Check if there's a current project
         current_project = self.memory.retrieve("current_project")
@@ -304,7 +376,7 @@ Setup Instructions:
         
         # Ensure file has extension
         if "." not in file_name:
-            ext = self._detect_extension(input_text)
+            ext = self._detect_extension(input_lower)
             file_name = f"{file_name}{ext}"
         
         # Generate file content
@@ -327,35 +399,28 @@ Setup Instructions:
             path=file_path,
             content=file_content
         )
+        self._get_file_index(current_project)[file_name.lower()] = file_path
         
-        # Update project_info.json
+        # Record the file in project info without rewriting project_info.json
         project_info_path = os.path.join(current_project, "project_info.json")
         if os.path.exists(project_info_path):
             try:
-                project_info_content = self.file_tool.execute(
-                    action="read",
-                    path=project_info_path
-                )
-                project_info = json.loads(project_info_content)
-                
-                # Add file to project_info
-                project_info["files"].append({
-                    "path": file_name,
-                    "description": f"Added based on: {input_text}"
-                })
-                
-                # Update project_info file
-                self.file_tool.execute(
-                    action="write",
-                    path=project_info_path,
-                    content=json.dumps(project_info, indent=2)
-                )
+                with open(os.path.join(current_project, _PROJECT_FILES_LOG), "a", encoding="utf-8") as f:
+                    f.write(json_utils.dumps({
+                        "path": file_name,
+                        "description": f"Added based on: {input_text}"
+                    }) + "\n")
             except Exception as e:
-                logger.error(f"[CodeAgent] Error updating project info: {str(e)}")
+                logger.error("[CodeAgent] Error updating project info: %s", e)
+            else:
+                if not self._compact_at_exit:
+                    # Leave project_info.json complete when the process exits
+                    atexit.register(self._compact_current_project)
+                    self._compact_at_exit = True
         
         # Log event
         log_message = f"Added file {file_name} to project {current_project}"
-        logger.info(f"[CodeAgent] {log_message}")
+        logger.info("[CodeAgent] %s", log_message)
         log_event("CodeAgent", input_text, log_message)
         
         return f"[CodeAgent] Added file {file_name} to project {os.path.basename(current_project)}"
@@ -378,13 +443,11 @@ Setup Instructions:
         # Find the file in the project
         file_path = os.path.join(current_project, file_name)
         if not os.path.exists(file_path):
-            # Look for partial matches
-            for root, dirs, files in os.walk(current_project):
-                for f in files:
-                    if file_name.lower() in f.lower():
-                        file_path = os.path.join(root, f)
-                        break
-                if os.path.exists(file_path):
+            # Look for partial matches in the project file index
+            name_lower = file_name.lower()
+            for relative_path, indexed_path in self._get_file_index(current_project).items():
+                if name_lower in os.path.basename(relative_path) and os.path.exists(indexed_path):
+                    file_path = indexed_path
                     break
         
         if not os.path.exists(file_path):
@@ -422,11 +485,78 @@ Setup Instructions:
         # Log event
         relative_path = os.path.relpath(file_path, current_project)
         log_message = f"Modified file {relative_path} in project {os.path.basename(current_project)}"
-        logger.info(f"[CodeAgent] {log_message}")
+        logger.info("[CodeAgent] %s", log_message)
         log_event("CodeAgent", input_text, log_message)
         
         return f"[CodeAgent] Modified file {relative_path} in project {os.path.basename(current_project)}"
     
+    def _set_current_project(self, project_folder: str) -> None:
+        """Switch the current project, compacting the info of the previous one"""
+        previous_project = self.memory.retrieve("current_project")
+        if previous_project and previous_project != project_folder:
+            self._compact_project_info(previous_project)
+        
+        self.current_project = project_folder
+        self.memory.store("current_project", project_folder)
+    
+    def _load_project_info(self, project_folder: str) -> Optional[Dict[str, Any]]:
+        """Load project_info.json merged with any files appended since it was written"""
+        project_info_path = os.path.join(project_folder, "project_info.json")
+        if not os.path.exists(project_info_path):
+            return None
+        
+        with open(project_info_path, "r", encoding="utf-8") as f:
+            project_info = json_utils.loads(f.read())
+        
+        files_log_path = os.path.join(project_folder, _PROJECT_FILES_LOG)
+        if os.path.exists(files_log_path):
+            with open(files_log_path, "r", encoding="utf-8") as f:
+                project_info.setdefault("files", []).extend(
+                    json_utils.loads(line) for line in f if line.strip()
+                )
+        
+        return project_info
+    
+    def _compact_project_info(self, project_folder: str) -> None:
+        """Fold the appended files log back into project_info.json"""
+        files_log_path = os.path.join(project_folder, _PROJECT_FILES_LOG)
+        if not os.path.exists(files_log_path):
+            return
+        
+        try:
+            project_info = self._load_project_info(project_folder)
+            if project_info is not None:
+                project_info_path = os.path.join(project_folder, "project_info.json")
+                with open(project_info_path, "w", encoding="utf-8") as f:
+                    f.write(json_utils.dumps(project_info, indent=True))
+            os.remove(files_log_path)
+        except Exception as e:
+            logger.error("[CodeAgent] Error compacting project info: %s", e)
+    
+    def _compact_current_project(self) -> None:
+        """Compact the current project's info; run at interpreter exit"""
+        current_project = self.memory.retrieve("current_project")
+        if current_project:
+            self._compact_project_info(current_project)
+    
+    def _get_file_index(self, project_folder: str) -> Dict[str, str]:
+        """
+        Get the file index for a project, building it on first use
+        
+        The index maps lowercased paths relative to the project folder to
+        full file paths, so name lookups don't have to walk the project.
+        """
+        index = self.memory.retrieve("file_index")
+        if index is None or index["project"] != project_folder:
+            files = {}
+            for root, dirs, names in os.walk(project_folder):
+                for name in names:
+                    full_path = os.path.join(root, name)
+                    files[os.path.relpath(full_path, project_folder).lower()] = full_path
+            index = {"project": project_folder, "files": files}
+            self.memory.store("file_index", index)
+        return index["files"]
+    
     def _execute_code(self, input_text: str) -> str:
         """Execute code in the current project"""
         # This would require CommandTool to be available
@@ -434,37 +564,24 @@ Setup Instructions:
         return "Code execution capability is not implemented yet. Will be added in a future update."
     
     # Helper methods (from original implementation)
-    def _detect_extension(self, prompt):
-        prompt = prompt.lower()
-        if "python" in prompt or "py" in prompt:
-            return ".py"
-        elif "html" in prompt and "css" in prompt:
-            return ".html"
-        elif "html" in prompt:
-            return ".html"
-        elif "javascript" in prompt or "js" in prompt:
-            return ".js"
-        elif "bash" in prompt or "shell" in prompt:
-            return ".sh"
-        elif "json" in prompt:
-            return ".json"
-        elif "java" in prompt:
-            return ".java"
-        elif "c++" in prompt or "cpp" in prompt:
-            return ".cpp"
-        elif "c#" in prompt:
-            return ".cs"
-        elif "typescript" in prompt or "ts" in prompt:
-            return ".ts"
-        return ".txt"
+    def _detect_extension(self, prompt_lower):
+        best = None
+        for token in _RE_TOKEN.findall(prompt_lower):
+            # Version suffixes ('python3', 'html5', 'c++11') name the same language
+            match = _EXTENSION_MAP.get(token) or _EXTENSION_MAP.get(token.rstrip("0123456789"))
+            if match and (best is None or match < best):
+                best = match
+                if best[0] == 0:
+                    break
+        return best[1] if best else ".txt"
 
     def _create_task_folder(self, task_prompt):
         base_dir = "generated"
-        os.makedirs(base_dir, exist_ok=True)
 
-        safe_name = re.sub(r'\W+', '_', task_prompt.lower()).strip('_')
+        safe_name = _safe_name(task_prompt)
         timestamp = time.strftime("%Y%m%d_%H%M")
         folder_name = os.path.join(base_dir, f"project_{timestamp}_{safe_name[:30]}")
+        # makedirs creates the base directory along with the task folder
         os.makedirs(folder_name, exist_ok=True)
         return folder_name
 
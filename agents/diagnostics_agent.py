@@ -1,14 +1,24 @@
 import logging
 from agents.base import Agent, AgentMetadata
-from tools.specs_tool import SpecsTool
-from tools.command_tool import CommandTool
 from utils.logger import log_event
 
 # Configure logging
 logger = logging.getLogger('mcp.agents.diagnostics')
 
+# SpecsTool info types keyed by their "check <target>" command
+_CHECK_COMMANDS = {
+    "check disk": "disk",
+    "check cpu": "cpu",
+    "check ram": "ram",
+    "check os": "os",
+}
+
 class DiagnosticsAgent(Agent):
     def __init__(self):
+        # Imported here so only processes that use this agent pay for them
+        from tools.specs_tool import SpecsTool
+        from tools.command_tool import CommandTool
+        
         super().__init__()
         self.specs_tool = SpecsTool()
         self.command_tool = CommandTool()
@@ -30,19 +40,18 @@ class DiagnosticsAgent(Agent):
     def _execute(self, input_text: str) -> str:
         """Execute diagnostic commands"""
         input_text = input_text.lower().strip()
-        logger.info(f"[DiagnosticsAgent] Processing: {input_text}")
-
-        if "check disk" in input_text:
-            result = self.specs_tool.execute(info_type="disk")
+        logger.info("[DiagnosticsAgent] Processing: %s", input_text)
 
-        elif "check cpu" in input_text:
-            result = self.specs_tool.execute(info_type="cpu")
+        # Fast path: the command is the first two words of the input
+        info_type = _CHECK_COMMANDS.get(" ".join(input_text.split()[:2]))
+        if info_type is None:
+            info_type = next(
+                (target for command, target in _CHECK_COMMANDS.items() if command in input_text),
+                None
+            )
 
-        elif "check ram" in input_text:
-            result = self.specs_tool.execute(info_type="ram")
-            
-        elif "check os" in input_text:
-            result = self.specs_tool.execute(info_type="os")
+        if info_type is not None:
+            result = self.specs_tool.execute(info_type=info_type)
 
         elif input_text.startswith("run "):
             command = input_text.replace("run ", "", 1)
@@ -51,6 +60,6 @@ class DiagnosticsAgent(Agent):
         else:
             result = "[DiagnosticsAgent] Unrecognized command. Try: check disk, check cpu, check ram, run echo test"
 
-        logger.info(f"[DiagnosticsAgent] Result: {result}")
+        logger.info("[DiagnosticsAgent] Result: %s", result)
         log_event("DiagnosticsAgent", input_text, result)
         return result
@@ -4,47 +4,8 @@ from agents.base import Agent, AgentMetadata
 # Configure logging
 logger = logging.getLogger('mcp.agents.help')
 
-class HelpAgent(Agent):
-    def __init__(self):
-        super().__init__()
-    
-    def _initialize_metadata(self) -> AgentMetadata:
-        """Initialize agent metadata"""
-        return AgentMetadata(
-            name="help",
-            description="Provides help and documentation on MCP usage",
-            version="1.0.0",
-            capabilities=[
-                "documentation",
-                "help_topics",
-                "command_reference"
-            ]
-        )
-    
-    def _execute(self, input_text: str) -> str:
-        """Provide help on various topics"""
-        topic = input_text.strip().lower()
-        logger.info(f"[HelpAgent] Providing help for: {topic}")
-
-        if not topic:
-            return self.general_help()
-
-        elif topic == "code":
-            return self.code_help()
-
-        elif topic == "diagnostics":
-            return self.diagnostics_help()
-
-        elif topic == "tools":
-            return self.tools_help()
-            
-        elif topic == "session":
-            return self.session_help()
-
-        return f"[HelpAgent] Unknown topic '{topic}'. Try: code, diagnostics, tools, session"
-
-    def general_help(self):
-        return """
+# Help texts, built once at import
+GENERAL_HELP = """
 [MCP HelpAgent] Available commands:
 
 run help code            → Show how to use the CodeAgent
@@ -56,8 +17,7 @@ list tools               → List all available tools
 use tool <toolname> ...  → Run a tool directly
 """
 
-    def code_help(self):
-        return """
+CODE_HELP = """
 [HelpAgent] CodeAgent Help:
 
 run code <task>          → Generates code based on your description
@@ -75,8 +35,7 @@ Examples:
   run code modify main.py to fix the bug in the calculation
 """
 
-    def diagnostics_help(self):
-        return """
+DIAGNOSTICS_HELP = """
 [HelpAgent] DiagnosticsAgent Help:
 
 System Information:
@@ -94,8 +53,7 @@ Examples:
   run diagnostics run dir
 """
 
-    def tools_help(self):
-        return """
+TOOLS_HELP = """
 [HelpAgent] Tool Help (via `use tool`):
 
 File Operations:
@@ -117,8 +75,7 @@ use tool specs info_type=disk
 use tool specs info_type=os
 """
 
-    def session_help(self):
-        return """
+SESSION_HELP = """
 [HelpAgent] Session Management:
 
 session new              → Start a new session
@@ -129,3 +86,57 @@ session info             → Show current session details
 Sessions allow you to maintain separate contexts for different tasks.
 Each session has its own memory and state.
 """
+
+UNKNOWN_TOPIC = "[HelpAgent] Unknown topic '{topic}'. Try: code, diagnostics, tools, session"
+
+# Help text for each topic (empty topic shows general help)
+HELP_TOPICS = {
+    "": GENERAL_HELP,
+    "code": CODE_HELP,
+    "diagnostics": DIAGNOSTICS_HELP,
+    "tools": TOOLS_HELP,
+    "session": SESSION_HELP
+}
+
+class HelpAgent(Agent):
+    def __init__(self):
+        super().__init__()
+    
+    def _initialize_metadata(self) -> AgentMetadata:
+        """Initialize agent metadata"""
+        return AgentMetadata(
+            name="help",
+            description="Provides help and documentation on MCP usage",
+            version="1.0.0",
+            capabilities=[
+                "documentation",
+                "help_topics",
+                "command_reference"
+            ]
+        )
+    
+    def _execute(self, input_text: str) -> str:
+        """Provide help on various topics"""
+        topic = input_text.strip().lower()
+        logger.info("[HelpAgent] Providing help for: %s", topic)
+
+        help_text = HELP_TOPICS.get(topic)
+        if help_text is not None:
+            return help_text
+
+        return UNKNOWN_TOPIC.format(topic=topic)
+
+    def general_help(self):
+        return GENERAL_HELP
+
+    def code_help(self):
+        return CODE_HELP
+
+    def diagnostics_help(self):
+        return DIAGNOSTICS_HELP
+
+    def tools_help(self):
+        return TOOLS_HELP
+
+    def session_help(self):
+        return SESSION_HELP
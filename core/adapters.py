@@ -19,12 +19,15 @@ class LegacyAgentAdapter(EnhancedAgent):
     with the enhanced agent interface.
     """
     
-    def __init__(self, legacy_agent, name: str, description: str = "", capabilities: List[str] = None):
+    def __init__(self, legacy_agent, name: str, description: str = "", capabilities: List[str] = None,
+                 record_history: bool = False):
         super().__init__()
         self.legacy_agent = legacy_agent
         self.name = name
         self.description = description
         self.agent_capabilities = capabilities or []
+        # Session history in the controller already records every call
+        self.record_history = record_history
     
     def _initialize_metadata(self) -> AgentMetadata:
         """Initialize agent metadata based on provided values"""
@@ -43,10 +46,11 @@ class LegacyAgentAdapter(EnhancedAgent):
         result = self.legacy_agent.run(input_text)
         
         # Store in agent memory
-        self.memory.add_to_history("legacy_run", {
-            "input": input_text,
-            "result": result
-        })
+        if self.record_history:
+            self.memory.add_to_history("legacy_run", {
+                "input": input_text,
+                "result": result
+            })
         
         return result
 
@@ -83,9 +87,10 @@ class LegacyToolAdapter(EnhancedTool):
         return self.legacy_tool.execute(**kwargs)
 
 
-def adapt_legacy_agent(agent, name: str, description: str = "", capabilities: List[str] = None) -> EnhancedAgent:
+def adapt_legacy_agent(agent, name: str, description: str = "", capabilities: List[str] = None,
+                       record_history: bool = False) -> EnhancedAgent:
     """Create an adapted version of a legacy agent"""
-    return LegacyAgentAdapter(agent, name, description, capabilities)
+    return LegacyAgentAdapter(agent, name, description, capabilities, record_history)
 
 
 def adapt_legacy_tool(tool, name: str, description: str = "", parameters: Dict[str, Dict[str, Any]] = None) -> EnhancedTool:
@@ -3,24 +3,45 @@ Enhanced Controller Module for MCP
 Provides advanced orchestration with event system and dependency management
 """
 import asyncio
+import threading
 import uuid
 import logging
-from typing import Dict, List, Any, Callable, Type, Optional
+from typing import Dict, List, Any, Callable, Type, Optional, Deque
+from collections import deque
 from datetime import datetime
 
 from core.registry import Registry
 from core.events import EventBus, Event
+from utils.event_loop import enable_eager_tasks, run_event_loop
+from utils.helpers import parse_kwargs
 
 # Configure logging
 logger = logging.getLogger('mcp.controller')
 
+# Built-in components: name -> (module path, class name)
+BUILTIN_AGENTS = {
+    "code": ("agents.code_agent", "CodeAgent"),
+    "diagnostics": ("agents.diagnostics_agent", "DiagnosticsAgent"),
+    "help": ("agents.help_agent", "HelpAgent"),
+}
+
+BUILTIN_TOOLS = {
+    "file": ("tools.file_tool", "FileTool"),
+    "command": ("tools.command_tool", "CommandTool"),
+    "specs": ("tools.specs_tool", "SpecsTool"),
+    "n8n": ("tools.n8n_tool", "N8nTool"),
+}
+
+DEFAULT_MAX_SESSION_HISTORY = 1000
+
 class Session:
     """Represents a user interaction session"""
-    def __init__(self, session_id: str = None):
+    def __init__(self, session_id: str = None, max_history: int = DEFAULT_MAX_SESSION_HISTORY):
         self.session_id = session_id or str(uuid.uuid4())
         self.created_at = datetime.now()
         self.context: Dict[str, Any] = {}
-        self.history: List[Dict[str, Any]] = []
+        # Oldest entries drop off once the history is full
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=max_history)
     
     def add_to_history(self, entry: Dict[str, Any]):
         """Add an entry to session history"""
@@ -56,11 +77,15 @@ class Controller:
         self.sessions: Dict[str, Session] = {}
         self.current_session = self._create_session()
         self._middleware_pipeline: List[Callable] = []
+        self._command_handlers: Dict[str, Callable] = {
+            "run": self._handle_run,
+            "use": self._handle_use
+        }
         self._load_modules()
         
     def _create_session(self) -> Session:
         """Create and register a new session"""
-        session = Session()
+        session = Session(max_history=self.config.get("max_session_history", DEFAULT_MAX_SESSION_HISTORY))
         self.sessions[session.session_id] = session
         return session
         
@@ -71,10 +96,11 @@ class Controller:
         
     async def process_command(self, command: str, args: str) -> str:
         """Process a command through middleware and route to handler"""
+        session = self.current_session
         context = {
             'command': command,
             'args': args,
-            'session': self.current_session,
+            'session': session,
             'response': None,
             'error': None
         }
@@ -93,156 +119,212 @@ class Controller:
         except Exception as e:
             context['error'] = str(e)
             # Publish error event
-            self.event_bus.publish(Event('error', {
-                'message': str(e),
-                'command': command,
-                'args': args
-            }))
+            if self.event_bus.has_subscribers('error'):
+                self.event_bus.publish(Event('error', {
+                    'message': str(e),
+                    'command': command,
+                    'args': args
+                }))
+        
+        response = context.get('response')
+        error = context.get('error')
         
         # Add to session history
-        self.current_session.add_to_history({
+        session.add_to_history({
             'command': command,
             'args': args,
-            'response': context.get('response'),
-            'error': context.get('error')
+            'response': response,
+            'error': error
         })
         
         # Return result or error
-        return context.get('response') or f"Error: {context.get('error')}"
+        if response is not None:
+            return response
+        return f"Error: {error}"
     
     async def _route_command(self, command: str, args: str) -> str:
         """Route command to appropriate handler"""
-        if command == "run":
-            parts = args.split(maxsplit=1)
-            if len(parts) < 1:
-                return "Usage: run <agent> <args>"
-            
-            agent_name = parts[0].lower()
-            agent_args = parts[1] if len(parts) > 1 else ""
-            
-            agent = self.registry.get_agent(agent_name)
-            if not agent:
-                return f"Unknown agent: {agent_name}"
-            
-            # Publish event before running agent
+        handler = self._command_handlers.get(command)
+        if handler is None:
+            return f"Unknown command: {command}"
+        return await handler(args)
+    
+    async def _handle_run(self, args: str) -> str:
+        """Handle the run command: run <agent> <args>"""
+        parts = args.split(maxsplit=1)
+        if len(parts) < 1:
+            return "Usage: run <agent> <args>"
+        
+        agent_name = parts[0].lower()
+        agent_args = parts[1] if len(parts) > 1 else ""
+        
+        agent = self.registry.get_agent(agent_name)
+        if not agent:
+            return f"Unknown agent: {agent_name}"
+        
+        # Publish event before running agent
+        if self.event_bus.has_subscribers('agent.before_run'):
             self.event_bus.publish(Event('agent.before_run', {
                 'agent': agent_name,
                 'args': agent_args
             }))
-            
-            try:
-                # Check if agent supports async
-                if hasattr(agent, 'run_async') and callable(agent.run_async):
-                    result = await agent.run_async(agent_args)
-                else:
-                    # Run synchronously if no async support
-                    result = agent.run(agent_args)
-                    
-                # Publish success event
+        
+        try:
+            # Async support is recorded by the registry at registration
+            if getattr(agent, '_mcp_is_async', False):
+                result = await agent.run_async(agent_args)
+            else:
+                # Run synchronously if no async support
+                result = agent.run(agent_args)
+                
+            # Publish success event
+            if self.event_bus.has_subscribers('agent.after_run'):
                 self.event_bus.publish(Event('agent.after_run', {
                     'agent': agent_name,
                     'args': agent_args,
                     'result': result
                 }))
-                
-                return result
-            except Exception as e:
-                # Publish failure event
+            
+            return result
+        except Exception as e:
+            # Publish failure event
+            if self.event_bus.has_subscribers('agent.error'):
                 self.event_bus.publish(Event('agent.error', {
                     'agent': agent_name,
                     'args': agent_args,
                     'error': str(e)
                 }))
-                raise
-                
-        elif command == "use":
-            parts = args.split(maxsplit=2)
-            if len(parts) < 2 or parts[0] != "tool":
-                return "Usage: use tool <toolname> <args>"
-            
-            tool_name = parts[1].lower()
-            tool_args = parts[2] if len(parts) > 2 else ""
-            
-            tool = self.registry.get_tool(tool_name)
-            if not tool:
-                return f"Unknown tool: {tool_name}"
-            
-            # Publish event before using tool
+            raise
+    
+    async def _handle_use(self, args: str) -> str:
+        """Handle the use command: use tool <toolname> <args>"""
+        if not args.startswith("tool"):
+            return "Usage: use tool <toolname> <args>"
+        
+        parts = args.split(maxsplit=2)
+        if len(parts) < 2 or parts[0] != "tool":
+            return "Usage: use tool <toolname> <args>"
+        
+        tool_name = parts[1].lower()
+        tool_args = parts[2] if len(parts) > 2 else ""
+        
+        tool = self.registry.get_tool(tool_name)
+        if not tool:
+            return f"Unknown tool: {tool_name}"
+        
+        # Publish event before using tool
+        if self.event_bus.has_subscribers('tool.before_use'):
             self.event_bus.publish(Event('tool.before_use', {
                 'tool': tool_name,
                 'args': tool_args
             }))
+        
+        try:
+            # Process args and execute tool
+            kwargs = parse_kwargs(tool_args)
             
-            try:
-                # Process args and execute tool
-                from utils.helpers import parse_kwargs
-                kwargs = parse_kwargs(tool_args)
-                
-                # Fallback to raw_input if no key=value found
-                if not kwargs and tool_args:
-                    kwargs = {"raw_input": tool_args}
-                
-                # Check if tool supports async
-                if hasattr(tool, 'execute_async') and callable(tool.execute_async):
-                    result = await tool.execute_async(**kwargs)
-                else:
-                    # Run synchronously if no async support
-                    result = tool.execute(**kwargs)
-                
-                # Publish success event
+            # Fallback to raw_input if no key=value found
+            if not kwargs and tool_args:
+                kwargs = {"raw_input": tool_args}
+            
+            # Async support is recorded by the registry at registration
+            if getattr(tool, '_mcp_is_async', False):
+                result = await tool.execute_async(**kwargs)
+            else:
+                # Run synchronously if no async support
+                result = tool.execute(**kwargs)
+            
+            # Publish success event
+            if self.event_bus.has_subscribers('tool.after_use'):
                 self.event_bus.publish(Event('tool.after_use', {
                     'tool': tool_name,
                     'args': tool_args,
                     'result': result
                 }))
-                
-                return result
-            except Exception as e:
-                # Publish failure event
+            
+            return result
+        except Exception as e:
+            # Publish failure event
+            if self.event_bus.has_subscribers('tool.error'):
                 self.event_bus.publish(Event('tool.error', {
                     'tool': tool_name,
                     'args': tool_args,
                     'error': str(e)
                 }))
-                raise
-                
-        else:
-            return f"Unknown command: {command}"
+            raise
+    
+    async def _read_input(self, prompt: str) -> str:
+        """
+        Read a line from stdin without blocking the event loop
+        
+        input() runs on a daemon thread so event subscribers and async
+        middleware keep running while waiting on the user, and a pending
+        read never holds up interpreter shutdown.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def resolve(setter, value):
+            if not future.done():
+                setter(value)
+        
+        def reader():
+            try:
+                line = input(prompt)
+            except BaseException as e:
+                loop.call_soon_threadsafe(resolve, future.set_exception, e)
+            else:
+                loop.call_soon_threadsafe(resolve, future.set_result, line)
+        
+        threading.Thread(target=reader, name="mcp-input", daemon=True).start()
+        return await future
     
     async def run_async(self):
         """Run the controller asynchronously"""
+        enable_eager_tasks(asyncio.get_running_loop())
         print("MCP is ready. Type a command like `run code` or `use tool`:")
         
-        while True:
-            user_input = input("» ").strip()
-            if not user_input:
-                print("Please enter a command. Type `help` or `?`.")
-                continue
+        try:
+            while True:
+                user_input = (await self._read_input("» ")).strip()
+                if not user_input:
+                    print("Please enter a command. Type `help` or `?`.")
+                    continue
+                    
+                # Split once and only lowercase the command word
+                parts = user_input.split(maxsplit=1)
+                command = parts[0].lower()
+                args = parts[1] if len(parts) > 1 else ""
                 
-            if user_input.lower() in ["exit", "quit"]:
-                break
+                if command in ("exit", "quit") and not args:
+                    break
                 
-            parts = user_input.split(maxsplit=1)
-            command = parts[0].lower()
-            args = parts[1] if len(parts) > 1 else ""
-            
-            if command in ["help", "?"]:
-                self._print_help()
-            elif command == "list":
-                self._handle_list_command(args)
-            else:
-                result = await self.process_command(command, args)
-                print(result)
+                if command in ("help", "?"):
+                    self._print_help()
+                elif command == "list":
+                    self._handle_list_command(args)
+                else:
+                    result = await self.process_command(command, args)
+                    print(result)
+        finally:
+            self.shutdown()
+    
+    def shutdown(self):
+        """Close the tools loaded so far, releasing their resources"""
+        for component_id in list(self.registry.categories.get('tool', {}).values()):
+            close = getattr(self.registry.get(component_id), 'close', None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    logger.error("Error closing tool %s: %s", component_id, e)
     
     def run(self):
         """Run the controller synchronously by starting an event loop"""
-        loop = asyncio.get_event_loop()
         try:
-            loop.run_until_complete(self.run_async())
+            run_event_loop(self.run_async())
         except KeyboardInterrupt:
             print("\nExiting...")
-        finally:
-            loop.close()
     
     def _handle_list_command(self, args: str):
         """Handle the list command"""
@@ -278,54 +360,9 @@ Special Commands:
 """)
 
     def _load_modules(self):
-        """Load modules based on config"""
-        # Load agents
-        try:
-            from agents.code_agent import CodeAgent
-            self.registry.register_agent("code", CodeAgent())
-            logger.info("Registered CodeAgent")
-        except ImportError as e:
-            logger.warning(f"Could not load CodeAgent: {str(e)}")
-
-        try:
-            from agents.diagnostics_agent import DiagnosticsAgent
-            self.registry.register_agent("diagnostics", DiagnosticsAgent())
-            logger.info("Registered DiagnosticsAgent")
-        except ImportError as e:
-            logger.warning(f"Could not load DiagnosticsAgent: {str(e)}")
-
-        try:
-            from agents.help_agent import HelpAgent
-            self.registry.register_agent("help", HelpAgent())
-            logger.info("Registered HelpAgent")
-        except ImportError as e:
-            logger.warning(f"Could not load HelpAgent: {str(e)}")
-
-        # Load tools
-        try:
-            from tools.file_tool import FileTool
-            self.registry.register_tool("file", FileTool())
-            logger.info("Registered FileTool")
-        except ImportError as e:
-            logger.warning(f"Could not load FileTool: {str(e)}")
-
-        try:
-            from tools.command_tool import CommandTool
-            self.registry.register_tool("command", CommandTool())
-            logger.info("Registered CommandTool")
-        except ImportError as e:
-            logger.warning(f"Could not load CommandTool: {str(e)}")
-
-        try:
-            from tools.specs_tool import SpecsTool
-            self.registry.register_tool("specs", SpecsTool())
-            logger.info("Registered SpecsTool")
-        except ImportError as e:
-            logger.warning(f"Could not load SpecsTool: {str(e)}")
-
-        try:
-            from tools.n8n_tool import N8nTool
-            self.registry.register_tool("n8n", N8nTool())
-            logger.info("Registered N8nTool")
-        except ImportError as e:
-            logger.warning(f"Could not load N8nTool: {str(e)}")
+        """Register built-in modules, imported on first use"""
+        for name, (module_path, class_name) in BUILTIN_AGENTS.items():
+            self.registry.register_lazy('agent', name, module_path, class_name)
+        
+        for name, (module_path, class_name) in BUILTIN_TOOLS.items():
+            self.registry.register_lazy('tool', name, module_path, class_name)
@@ -2,22 +2,41 @@
 Event System Module for MCP
 Provides an event bus for inter-component communication
 """
-from typing import Dict, List, Any, Callable, Optional
-import uuid
+from typing import Dict, List, Any, Callable, Optional, Deque, Tuple, Union, Mapping
+from collections import deque
+from itertools import count, islice
 import logging
+import time
 from datetime import datetime
+from types import MappingProxyType
 
 # Configure logging
 logger = logging.getLogger('mcp.events')
 
+# Shared read-only payload for events published without data
+_EMPTY_DATA: Mapping[str, Any] = MappingProxyType({})
+
+# Process-local id sequences; ids only need to be unique within this bus
+_event_ids = count(1)
+_subscription_ids = count(1)
+
 class Event:
     """Event class representing a system event"""
     
+    __slots__ = ("id", "type", "data", "_ts_ns")
+    
     def __init__(self, event_type: str, data: Dict[str, Any] = None):
-        self.id = str(uuid.uuid4())
+        self.id = next(_event_ids)
         self.type = event_type
-        self.data = data or {}
-        self.timestamp = datetime.now()
+        # Read-only view so subscribers cannot change what others (and the history) see
+        self.data = MappingProxyType(data) if data else _EMPTY_DATA
+        # Raw wall-clock nanoseconds; converted to a datetime only when read
+        self._ts_ns = time.time_ns()
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Time the event was created"""
+        return datetime.fromtimestamp(self._ts_ns / 1e9)
     
     def __str__(self) -> str:
         return f"Event({self.type}, {self.id})"
@@ -26,8 +45,11 @@ class Event:
 class EventSubscription:
     """Represents a subscription to an event"""
     
-    def __init__(self, event_type: str, callback: Callable[[Event], None], subscription_id: str = None):
-        self.id = subscription_id or str(uuid.uuid4())
+    __slots__ = ("id", "event_type", "callback")
+    
+    def __init__(self, event_type: str, callback: Callable[[Event], None],
+                 subscription_id: Union[int, str] = None):
+        self.id = subscription_id or next(_subscription_ids)
         self.event_type = event_type
         self.callback = callback
     
@@ -44,42 +66,60 @@ class EventBus:
     """
     
     def __init__(self):
-        self.subscriptions: Dict[str, List[EventSubscription]] = {}
-        self.event_history: List[Event] = []
+        # event type -> {subscription id -> subscription}, in subscribe order
+        self.subscriptions: Dict[str, Dict[Union[int, str], EventSubscription]] = {}
+        # event type -> subscribers to notify, including wildcard ones
+        self._dispatch_cache: Dict[str, Tuple[EventSubscription, ...]] = {}
         self.max_history_size = 100
+        # Oldest events drop off once the history is full
+        self.event_history: Deque[Event] = deque(maxlen=self.max_history_size)
+    
+    def has_subscribers(self, event_type: str) -> bool:
+        """
+        Check whether publishing an event type would reach any subscriber
+        
+        Lets publishers skip building an event nobody listens to. Events
+        skipped this way are not recorded in the event history.
+        """
+        subscribers = self._dispatch_cache.get(event_type)
+        if subscribers is None:
+            subscribers = self._build_dispatch(event_type)
+        return bool(subscribers)
     
     def publish(self, event: Event) -> None:
         """Publish an event to all subscribers"""
-        logger.debug(f"Publishing event: {event}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Publishing event: %s", event)
         
         # Store in history
         self.event_history.append(event)
-        if len(self.event_history) > self.max_history_size:
-            self.event_history.pop(0)
         
-        # Get subscribers for this event type
-        subscribers = self.subscriptions.get(event.type, [])
-        
-        # Also get subscribers for wildcard events
-        wildcard_subscribers = self.subscriptions.get('*', [])
-        all_subscribers = subscribers + wildcard_subscribers
+        # Subscribers for this event type followed by wildcard subscribers
+        subscribers = self._dispatch_cache.get(event.type)
+        if subscribers is None:
+            subscribers = self._build_dispatch(event.type)
+        if not subscribers:
+            return
         
         # Notify all subscribers
-        for subscription in all_subscribers:
+        for subscription in subscribers:
+            callback = subscription.callback
             try:
-                subscription.callback(event)
+                callback(event)
             except Exception as e:
-                logger.error(f"Error in event handler for {event}: {e}")
+                logger.error("Error in event handler for %s: %s", event, e)
     
     def subscribe(self, event_type: str, callback: Callable[[Event], None]) -> EventSubscription:
         """Subscribe to an event type"""
         subscription = EventSubscription(event_type, callback)
         
         if event_type not in self.subscriptions:
-            self.subscriptions[event_type] = []
+            self.subscriptions[event_type] = {}
         
-        self.subscriptions[event_type].append(subscription)
-        logger.debug(f"Added subscription: {subscription}")
+        self.subscriptions[event_type][subscription.id] = subscription
+        self._invalidate_dispatch(event_type)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Added subscription: %s", subscription)
         
         return subscription
     
@@ -87,25 +127,49 @@ class EventBus:
         """Unsubscribe from an event type"""
         event_type = subscription.event_type
         
-        if event_type in self.subscriptions:
-            subscriptions = self.subscriptions[event_type]
-            for i, sub in enumerate(subscriptions):
-                if sub.id == subscription.id:
-                    subscriptions.pop(i)
-                    logger.debug(f"Removed subscription: {subscription}")
-                    
-                    # Clean up empty lists
-                    if not subscriptions:
-                        del self.subscriptions[event_type]
-                    
-                    return True
+        subscriptions = self.subscriptions.get(event_type)
+        if subscriptions is None or subscriptions.pop(subscription.id, None) is None:
+            return False
+        
+        self._invalidate_dispatch(event_type)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Removed subscription: %s", subscription)
         
-        return False
+        # Clean up empty mappings
+        if not subscriptions:
+            del self.subscriptions[event_type]
+        
+        return True
+    
+    def _build_dispatch(self, event_type: str) -> Tuple[EventSubscription, ...]:
+        """Cache and return the subscribers to notify for an event type"""
+        subs_map = self.subscriptions
+        direct = subs_map.get(event_type)
+        wild = subs_map.get('*')
+        if wild is None:
+            subscribers = tuple(direct.values()) if direct else ()
+        elif direct is None or event_type == '*':
+            subscribers = tuple(wild.values())
+        else:
+            subscribers = (*direct.values(), *wild.values())
+        self._dispatch_cache[event_type] = subscribers
+        return subscribers
+    
+    def _invalidate_dispatch(self, event_type: str) -> None:
+        """Drop cached subscriber tuples affected by a subscription change"""
+        if event_type == '*':
+            # Wildcard subscribers are part of every cached tuple
+            self._dispatch_cache.clear()
+        else:
+            self._dispatch_cache.pop(event_type, None)
     
     def get_recent_events(self, event_type: Optional[str] = None, limit: int = 10) -> List[Event]:
         """Get recent events, optionally filtered by type"""
+        if limit <= 0:
+            return []
         if event_type:
-            filtered = [e for e in self.event_history if e.type == event_type]
-            return filtered[-limit:]
+            # Walk newest first and stop once enough matches are found
+            matches = islice((e for e in reversed(self.event_history) if e.type == event_type), limit)
+            return list(matches)[::-1]
         else:
-            return self.event_history[-limit:]
+            return list(islice(reversed(self.event_history), limit))[::-1]
@@ -1,9 +1,10 @@
 # === core/mcp_loader.py ===
-import json
+from utils import json_utils
 
 def load_mcp_config(path):
-    with open(path, "r") as f:
-        return json.load(f)
+    # Parse the raw bytes; orjson (when installed) skips the text decode
+    with open(path, "rb") as f:
+        return json_utils.loads(f.read())
 
 
 # === core/registry.py ===
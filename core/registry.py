@@ -2,22 +2,43 @@
 Enhanced Registry Module for MCP
 Provides an improved component registry with metadata and discovery features
 """
-from typing import Dict, List, Any, Optional, Type, Union
+from typing import Dict, List, Any, Optional, Type, Union, Tuple, Set, Iterable
+import importlib
 import logging
+import sys
 import uuid
 
 # Configure logging
 logger = logging.getLogger('mcp.registry')
 
+# Length of the character n-grams indexed for search
+_NGRAM = 3
+
+# Async entry point checked by the controller for each category
+ASYNC_METHODS = {
+    'agent': 'run_async',
+    'tool': 'execute_async',
+}
+
 class RegistryEntry:
     """Registry entry containing component and metadata"""
     
-    def __init__(self, component_id: str, component: Any, category: str, metadata: Dict[str, Any] = None):
+    __slots__ = ("id", "component", "category", "name", "metadata", "created_at",
+                 "name_lc", "metadata_lc", "search_grams")
+    
+    def __init__(self, component_id: str, component: Any, category: str, metadata: Dict[str, Any] = None,
+                 name: str = None):
         self.id = component_id
         self.component = component
         self.category = category
+        self.name = name
         self.metadata = metadata or {}
         self.created_at = None  # Will be set by registry
+        # Lowercased name and string metadata values, matched by search
+        self.name_lc = name.lower() if name else ""
+        self.metadata_lc: Tuple[str, ...] = tuple(
+            v.lower() for v in self.metadata.values() if isinstance(v, str))
+        self.search_grams: Set[str] = set()  # Will be set by registry
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert entry to dictionary (excluding component instance)"""
@@ -37,14 +58,15 @@ class Registry:
     - Metadata storage and querying
     - Versioning support
     - Dynamic component discovery
+    - Lazy loading of components on first access
     """
     
     def __init__(self):
         self.components: Dict[str, RegistryEntry] = {}
         self.categories: Dict[str, Dict[str, str]] = {}  # category -> {name -> id}
-        # For backward compatibility
-        self.agents: Dict[str, Any] = {}
-        self.tools: Dict[str, Any] = {}
+        self.lazy_specs: Dict[str, Dict[str, Tuple[str, str, str]]] = {}  # category -> {name -> (module, class, id)}
+        self._lazy_ids: Dict[str, Tuple[str, str]] = {}  # id reserved for a lazy component -> (category, name)
+        self._search_index: Dict[str, Set[str]] = {}  # n-gram -> {component id}
     
     def register(self, category: str, name: str, component: Any, 
                  metadata: Dict[str, Any] = None, component_id: str = None) -> str:
@@ -61,13 +83,22 @@ class Registry:
         Returns:
             The component ID
         """
+        # Intern lookup keys so later lookups compare by identity
+        category = sys.intern(category)
+        name = sys.intern(name)
+        
         # Generate component ID if not provided
         component_id = component_id or str(uuid.uuid4())
         
         # Create and store entry
-        entry = RegistryEntry(component_id, component, category, metadata)
+        entry = RegistryEntry(component_id, component, category, metadata, name)
         self.components[component_id] = entry
         
+        # Index the name and string metadata values for search
+        entry.search_grams = self._ngrams((entry.name_lc,) + entry.metadata_lc)
+        for gram in entry.search_grams:
+            self._search_index.setdefault(gram, set()).add(component_id)
+        
         # Initialize category if not exists
         if category not in self.categories:
             self.categories[category] = {}
@@ -75,15 +106,111 @@ class Registry:
         # Add to category index with name
         self.categories[category][name] = component_id
         
-        # For backward compatibility
-        if category == 'agent':
-            self.agents[name] = component
-        elif category == 'tool':
-            self.tools[name] = component
+        # A concrete registration replaces any pending lazy one
+        spec = self.lazy_specs.get(category, {}).pop(name, None)
+        if spec is not None:
+            self._lazy_ids.pop(spec[2], None)
+        
+        # Decide once whether the controller can await this component
+        async_method = ASYNC_METHODS.get(category)
+        if async_method:
+            try:
+                component._mcp_is_async = callable(getattr(component, async_method, None))
+            except AttributeError:
+                pass  # Components without an instance __dict__ run synchronously
         
         logger.info(f"Registered {category} '{name}' with ID {component_id}")
         return component_id
     
+    # For backward compatibility: {name: component} views of all components
+    @property
+    def agents(self) -> Dict[str, Any]:
+        """All agents by name"""
+        return self._loaded('agent')
+    
+    @property
+    def tools(self) -> Dict[str, Any]:
+        """All tools by name"""
+        return self._loaded('tool')
+    
+    def _loaded(self, category: str) -> Dict[str, Any]:
+        """Build a {name: component} dict for a category, loading any pending components"""
+        self._load_pending(category)
+        components = self.components
+        return {name: components[cid].component
+                for name, cid in self.categories.get(category, {}).items()}
+    
+    def register_lazy(self, category: str, name: str, module_path: str, class_name: str) -> str:
+        """
+        Register a component to be imported and instantiated on first access
+        
+        Args:
+            category: Component category (e.g., 'agent', 'tool')
+            name: Component name (used for lookups)
+            module_path: Dotted path of the module defining the component
+            class_name: Name of the component class in that module
+            
+        Returns:
+            The ID the component will be registered under once loaded
+        """
+        category = sys.intern(category)
+        name = sys.intern(name)
+        if category not in self.lazy_specs:
+            self.lazy_specs[category] = {}
+        
+        previous = self.lazy_specs[category].get(name)
+        if previous is not None:
+            self._lazy_ids.pop(previous[2], None)
+        
+        component_id = str(uuid.uuid4())
+        self.lazy_specs[category][name] = (module_path, class_name, component_id)
+        self._lazy_ids[component_id] = (category, name)
+        logger.debug(f"Registered lazy {category} '{name}' ({module_path}.{class_name})")
+        return component_id
+    
+    def _load_lazy(self, category: str, name: str) -> Optional[Any]:
+        """Import, instantiate and register a lazily registered component"""
+        spec = self.lazy_specs.get(category, {}).pop(name, None)
+        if spec is None:
+            return None
+        
+        module_path, class_name, component_id = spec
+        del self._lazy_ids[component_id]
+        try:
+            module = importlib.import_module(module_path)
+            component = getattr(module, class_name)()
+        except Exception as e:
+            if isinstance(e, ImportError):
+                logger.warning(f"Could not load {class_name}: {str(e)}")
+            else:
+                logger.exception(f"Could not create {class_name}")
+            # Keep it pending so every later access retries and reports the error
+            self.lazy_specs.setdefault(category, {})[name] = spec
+            self._lazy_ids[component_id] = (category, name)
+            return None
+        
+        # Use the component's own metadata if it has any
+        metadata = None
+        if hasattr(component, 'metadata') and hasattr(component.metadata, 'to_dict'):
+            metadata = component.metadata.to_dict()
+        
+        self.register(category, name, component, metadata, component_id)
+        return component
+    
+    def _load_pending(self, category: str = None) -> None:
+        """Load every pending lazy component, optionally only of one category"""
+        for lazy_category in ([category] if category else list(self.lazy_specs)):
+            for name in list(self.lazy_specs.get(lazy_category, {})):
+                self._load_lazy(lazy_category, name)
+    
+    def _entry(self, component_id: str) -> Optional[RegistryEntry]:
+        """Get the entry for an ID, loading the component if it is still pending"""
+        entry = self.components.get(component_id)
+        if entry is None and component_id in self._lazy_ids:
+            self._load_lazy(*self._lazy_ids[component_id])
+            entry = self.components.get(component_id)
+        return entry
+    
     def unregister(self, component_id: str) -> bool:
         """
         Unregister a component from the registry
@@ -95,23 +222,30 @@ class Registry:
             True if component was unregistered, False if not found
         """
         if component_id not in self.components:
-            return False
+            # A pending lazy component is dropped without loading it
+            lazy = self._lazy_ids.pop(component_id, None)
+            if lazy is None:
+                return False
+            category, name = lazy
+            del self.lazy_specs[category][name]
+            logger.info(f"Unregistered component with ID {component_id}")
+            return True
         
         # Get the entry
         entry = self.components[component_id]
         
-        # Remove from category index
-        if entry.category in self.categories:
-            for name, cid in list(self.categories[entry.category].items()):
-                if cid == component_id:
-                    # For backward compatibility
-                    if entry.category == 'agent' and name in self.agents:
-                        del self.agents[name]
-                    elif entry.category == 'tool' and name in self.tools:
-                        del self.tools[name]
-                    
-                    del self.categories[entry.category][name]
-                    break
+        # Remove from category index unless the name was re-registered since
+        names = self.categories.get(entry.category, {})
+        if names.get(entry.name) == component_id:
+            del names[entry.name]
+        
+        # Remove from search index
+        for gram in entry.search_grams:
+            ids = self._search_index.get(gram)
+            if ids is not None:
+                ids.discard(component_id)
+                if not ids:
+                    del self._search_index[gram]
         
         # Remove from components
         del self.components[component_id]
@@ -129,7 +263,7 @@ class Registry:
         Returns:
             Component instance or None if not found
         """
-        entry = self.components.get(component_id)
+        entry = self._entry(component_id)
         return entry.component if entry else None
     
     def get_by_name(self, category: str, name: str) -> Optional[Any]:
@@ -143,8 +277,10 @@ class Registry:
         Returns:
             Component instance or None if not found
         """
+        category = sys.intern(category)
+        name = sys.intern(name)
         if category not in self.categories or name not in self.categories[category]:
-            return None
+            return self._load_lazy(category, name)
         
         component_id = self.categories[category][name]
         return self.get(component_id)
@@ -159,7 +295,7 @@ class Registry:
         Returns:
             Component metadata or None if not found
         """
-        entry = self.components.get(component_id)
+        entry = self._entry(component_id)
         return entry.metadata if entry else None
     
     def get_all(self, category: str = None) -> Dict[str, Any]:
@@ -174,6 +310,9 @@ class Registry:
         """
         result = {}
         
+        # Load any pending lazy components so the result is complete
+        self._load_pending(category)
+        
         if category:
             # Get only components of the specified category
             if category in self.categories:
@@ -198,10 +337,9 @@ class Registry:
         Returns:
             List of component names
         """
-        if category not in self.categories:
-            return []
-        
-        return list(self.categories[category].keys())
+        names = list(self.categories.get(category, {}).keys())
+        names.extend(self.lazy_specs.get(category, {}).keys())
+        return names
     
     def search(self, query: str, category: str = None) -> List[Dict[str, Any]]:
         """
@@ -217,31 +355,66 @@ class Registry:
         results = []
         query = query.lower()
         
-        for component_id, entry in self.components.items():
+        # Pending components' metadata is only known once they are loaded
+        self._load_pending(category)
+        
+        for component_id in self._search_candidates(query):
+            entry = self.components.get(component_id)
+            if entry is None:
+                continue
+            
             # Apply category filter if specified
             if category and entry.category != category:
                 continue
             
             # Check name match in category index
-            name_match = False
-            if entry.category in self.categories:
-                for name, cid in self.categories[entry.category].items():
-                    if cid == component_id and query in name.lower():
-                        name_match = True
-                        break
+            name_match = (query in entry.name_lc and
+                          self.categories.get(entry.category, {}).get(entry.name) == component_id)
             
             # Check metadata match
-            metadata_match = any(
-                isinstance(v, str) and query in v.lower()
-                for v in entry.metadata.values()
-                if isinstance(v, str)
-            )
+            metadata_match = any(query in value for value in entry.metadata_lc)
             
             if name_match or metadata_match:
                 results.append(entry.to_dict())
         
         return results
     
+    @staticmethod
+    def _ngrams(texts: Iterable[str]) -> Set[str]:
+        """Collect the character n-grams of lowercased texts for the search index"""
+        grams = set()
+        for text in texts:
+            grams.update(text[i:i + _NGRAM] for i in range(len(text) - _NGRAM + 1))
+        return grams
+    
+    def _search_candidates(self, query: str) -> Iterable[str]:
+        """
+        Narrow a search down to components that may contain the query
+        
+        A text containing the query contains every n-gram of it, so only
+        components indexed under all of them are returned. Callers still
+        confirm the full substring match. Queries shorter than one n-gram
+        check every component.
+        """
+        if len(query) < _NGRAM:
+            return list(self.components)
+        
+        id_sets = []
+        for gram in self._ngrams((query,)):
+            ids = self._search_index.get(gram)
+            if not ids:
+                return ()
+            id_sets.append(ids)
+        
+        # Intersect starting from the rarest n-gram
+        id_sets.sort(key=len)
+        candidates = set(id_sets[0])
+        for ids in id_sets[1:]:
+            candidates &= ids
+            if not candidates:
+                break
+        return candidates
+    
     # Convenience methods for agent registration
     def register_agent(self, name: str, agent: Any, metadata: Dict[str, Any] = None) -> str:
         """Register an agent component"""
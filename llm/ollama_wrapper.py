@@ -1,19 +1,173 @@
+import codecs
+import os
 import subprocess
+import threading
+from collections import OrderedDict
+
+from utils import json_utils
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+# Local Ollama server
+DEFAULT_HOST = "http://localhost:11434"
+
+# (connect, read) timeouts in seconds for requests to the Ollama server
+DEFAULT_TIMEOUT = (5, 300)
+
+# Bytes read from the ollama process per chunk
+READ_CHUNK_SIZE = 65536
 
 class OllamaLLM:
-    def __init__(self, model="deepseek-coder"):
+    def __init__(self, model="deepseek-coder", host=DEFAULT_HOST, cache_size=0, timeout=DEFAULT_TIMEOUT):
         self.model = model
+        self.host = host.rstrip("/")
+        self.timeout = timeout
+        # Keep-alive HTTP session to the Ollama server, reused across calls
+        self._session = requests.Session() if REQUESTS_AVAILABLE else None
+        # Optional LRU cache of (model, prompt) -> response; off by default
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
 
     def generate(self, prompt):
+        key = (self.model, prompt)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        if self._session is not None:
+            try:
+                response = self._generate_http(prompt)
+            except requests.ConnectionError:
+                # Server not reachable over HTTP, let the CLI report it
+                response = self._generate_cli(prompt)
+            except Exception as e:
+                return f"[OllamaLLM Error] {str(e)}"
+        else:
+            response = self._generate_cli(prompt)
+
+        if self.cache_size > 0 and not response.startswith("[OllamaLLM Error]"):
+            self._cache[key] = response
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return response
+
+    def _generate_http(self, prompt):
+        """Generate a response through the Ollama HTTP API"""
+        result = self._session.post(
+            f"{self.host}/api/generate",
+            json={"model": self.model, "prompt": prompt, "stream": False},
+            timeout=self.timeout
+        )
+        if not result.ok:
+            return f"[OllamaLLM Error] {result.status_code} {result.text.strip()}"
+        return result.json().get("response", "").strip()
+
+    def _generate_cli(self, prompt):
+        """Generate a response by running the ollama command line client"""
         try:
-            result = subprocess.run(
-                ["ollama", "run", self.model],
-                input=prompt.encode("utf-8"),
-                capture_output=True,
-                check=True
-            )
-            return result.stdout.decode("utf-8").strip()
+            return "".join(self._stream_cli(prompt)).strip()
         except subprocess.CalledProcessError as e:
-            return f"[OllamaLLM Error] {e.stderr.decode('utf-8').strip()}"
+            return f"[OllamaLLM Error] {e.stderr.strip()}"
         except Exception as e:
             return f"[OllamaLLM Error] {str(e)}"
+
+    def generate_stream(self, prompt):
+        """Generate a response, yielding output chunks as they arrive"""
+        if self._session is not None:
+            started = False
+            try:
+                for chunk in self._stream_http(prompt):
+                    started = True
+                    yield chunk
+                return
+            except requests.ConnectionError as e:
+                if started:
+                    yield f"[OllamaLLM Error] {str(e)}"
+                    return
+                # Server not reachable over HTTP, let the CLI report it
+            except Exception as e:
+                yield f"[OllamaLLM Error] {str(e)}"
+                return
+
+        try:
+            yield from self._stream_cli(prompt)
+        except subprocess.CalledProcessError as e:
+            yield f"[OllamaLLM Error] {e.stderr.strip()}"
+        except Exception as e:
+            yield f"[OllamaLLM Error] {str(e)}"
+
+    def _stream_http(self, prompt):
+        """Stream a response from the Ollama HTTP API, yielding each NDJSON line's text"""
+        with self._session.post(
+            f"{self.host}/api/generate",
+            json={"model": self.model, "prompt": prompt, "stream": True},
+            timeout=self.timeout,
+            stream=True
+        ) as result:
+            if not result.ok:
+                yield f"[OllamaLLM Error] {result.status_code} {result.text.strip()}"
+                return
+            for line in result.iter_lines(chunk_size=READ_CHUNK_SIZE):
+                if not line:
+                    continue
+                data = json_utils.loads(line)
+                if "error" in data:
+                    yield f"[OllamaLLM Error] {data['error']}"
+                    return
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    return
+
+    def _stream_cli(self, prompt):
+        """
+        Run ollama and yield its stdout as text chunks
+
+        Output is read straight from the pipe and decoded incrementally, so a
+        multi-byte character split across reads is never mangled. Raises
+        CalledProcessError with the captured stderr if ollama fails.
+        """
+        process = subprocess.Popen(
+            ["ollama", "run", self.model],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        # Drain stderr alongside stdout so a chatty stderr cannot fill its pipe
+        stderr_chunks = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True)
+        stderr_reader.start()
+
+        try:
+            try:
+                process.stdin.write(prompt.encode("utf-8"))
+                process.stdin.close()
+            except BrokenPipeError:
+                pass  # ollama exited early; its exit status and stderr say why
+
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            fd = process.stdout.fileno()
+            while True:
+                data = os.read(fd, READ_CHUNK_SIZE)
+                if not data:
+                    break
+                text = decoder.decode(data)
+                if text:
+                    yield text
+            text = decoder.decode(b"", final=True)
+            if text:
+                yield text
+        finally:
+            process.stdout.close()
+            returncode = process.wait()
+            stderr_reader.join()
+
+        if returncode != 0:
+            stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+            raise subprocess.CalledProcessError(returncode, process.args, stderr=stderr)
@@ -2,22 +2,37 @@
 # Entry point for the AI Assistant MCP
 import os
 import sys
-import argparse
 import logging
-import asyncio
+from types import SimpleNamespace
 
 from core.controller import Controller
 from core.mcp_loader import load_mcp_config
 from utils.logger import setup_logging
+from utils.event_loop import install_uvloop, run_event_loop
+
+DEFAULT_CONFIG_PATH = "config/mcp_config.json"
+
+# Parsed arguments for a plain `python main.py`, which skips argparse entirely
+_DEFAULT_ARGS = SimpleNamespace(
+    debug=False,
+    async_mode=False,
+    config=DEFAULT_CONFIG_PATH,
+    log_level="INFO",
+    log_file=None
+)
 
 def parse_arguments():
     """Parse command line arguments"""
+    if len(sys.argv) == 1:
+        return _DEFAULT_ARGS
+    
+    import argparse
     parser = argparse.ArgumentParser(description="AI Assistant MCP")
     
     # Mode selection
     parser.add_argument("--debug", action="store_true", help="Run in debug mode")
     parser.add_argument("--async", action="store_true", dest="async_mode", help="Run with async support")
-    parser.add_argument("--config", default="config/mcp_config.json", help="Path to config file")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH, help="Path to config file")
     
     # Logging options
     parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], default="INFO", help="Set logging level")
@@ -44,6 +59,9 @@ def main():
     log_level = getattr(logging, args.log_level)
     setup_logging(level=log_level, log_file=args.log_file)
     
+    # Use uvloop for the event loop when available
+    install_uvloop()
+    
     # Load configuration
     config = load_mcp_config(args.config)
     
@@ -63,7 +81,7 @@ def main():
         if args.async_mode:
             # Run with asyncio
             print("Running in async mode")
-            asyncio.run(run_async(config, args.debug))
+            run_event_loop(run_async(config, args.debug))
         else:
             # Run synchronously
             run_sync(config, args.debug)
@@ -15,6 +15,8 @@ from tools.command_tool import CommandTool
 from tools.specs_tool import SpecsTool
 from tools.n8n_tool import N8nTool
 from utils.logger import setup_logging
+from utils.helpers import parse_kwargs, format_size
+from utils.event_ring import RingEventLogger, read_ring
 
 # Set up logging
 setup_logging(level=logging.INFO)
@@ -37,6 +39,17 @@ def test_registry():
     assert "test_agent" in registry.get_names("agent")
     assert "test_tool" in registry.get_names("tool")
     
+    # Test search by name and metadata
+    registry.register("tool", "search_tool", "search_tool_instance", {"description": "Find files on disk"})
+    assert [e["metadata"] for e in registry.search("files on")] == [{"description": "Find files on disk"}]
+    assert len(registry.search("test_", "agent")) == 1
+    assert len(registry.search("iles o")) == 1
+    assert registry.search("missing") == []
+    
+    # Test lazy components are visible by ID and in the compatibility views
+    lazy_id = registry.register_lazy("agent", "lazy_help", "agents.help_agent", "HelpAgent")
+    assert registry.get(lazy_id) is registry.agents["lazy_help"]
+    
     print("Registry test passed!")
 
 def test_agent_creation():
@@ -104,6 +117,10 @@ def test_controller_setup():
     assert "file" in controller.registry.get_names("tool")
     assert "command" in controller.registry.get_names("tool")
     
+    # Modules are loaded on first access
+    assert controller.registry.get_agent("help") is not None
+    assert controller.registry.get_names("agent").count("help") == 1
+    
     # These may fail depending on dependencies, so we don't assert them
     print(f"Tools registered: {controller.registry.get_names('tool')}")
     
@@ -136,6 +153,110 @@ def test_file_tool():
     
     print("File tool test passed!")
 
+def test_command_tool_safety():
+    """Test that dangerous commands are blocked"""
+    print("Testing command tool safety...")
+    
+    command_tool = CommandTool()
+    blocked = "[CommandTool] Command blocked for safety."
+    
+    assert command_tool.execute(raw_input="rm -rf build") == blocked
+    assert command_tool.execute(raw_input="/sbin/shutdown now") == blocked
+    assert command_tool.execute(raw_input="mkfs.ext4 /dev/sdb1") == blocked
+    assert command_tool.execute(raw_input="echo formatting") != blocked
+    assert command_tool.execute(raw_input="sh -c 'rm -f /tmp/victim_file'") == blocked
+    assert command_tool.execute(raw_input="bash -lc 'r\\m -f x'") == blocked
+    assert command_tool.execute(raw_input="dir&del x") == blocked
+    assert command_tool.execute(raw_input='cmd /c "del x"') == blocked
+    
+    print("Command tool safety test passed!")
+
+def test_code_agent_detection():
+    """Test CodeAgent mode and extension detection"""
+    print("Testing code agent detection...")
+    
+    code_agent = CodeAgent()
+    
+    # Mode detection
+    assert code_agent._detect_mode("create a new project for a todo app") == "new_project"
+    assert code_agent._detect_mode("add a file called utils.py") == "add_file"
+    assert code_agent._detect_mode("modify main.py file to fix a bug") == "modify_file"
+    assert code_agent._detect_mode("run the script") == "execute_code"
+    assert code_agent._detect_mode("build a countdown timer") == "single_file"
+    
+    # Extension detection
+    assert code_agent._detect_extension("write a python calculator") == ".py"
+    assert code_agent._detect_extension("an html and css landing page") == ".html"
+    assert code_agent._detect_extension("a javascript game") == ".js"
+    assert code_agent._detect_extension("a java program") == ".java"
+    assert code_agent._detect_extension("hello world in c++") == ".cpp"
+    assert code_agent._detect_extension("a c# console app") == ".cs"
+    assert code_agent._detect_extension("write a python3 tool") == ".py"
+    assert code_agent._detect_extension("an html5 page") == ".html"
+    assert code_agent._detect_extension("a c++11 app") == ".cpp"
+    assert code_agent._detect_extension("a happy little note") == ".txt"
+    
+    print("Code agent detection test passed!")
+
+def test_parse_kwargs():
+    """Test key=value argument parsing"""
+    print("Testing parse_kwargs...")
+    
+    assert parse_kwargs('action=write path=test.txt content="Hello world"') == {
+        "action": "write",
+        "path": "test.txt",
+        "content": "Hello world"
+    }
+    assert parse_kwargs("info_type=ram detailed='yes'") == {"info_type": "ram", "detailed": "yes"}
+    assert parse_kwargs("path=a=b") == {"path": "a=b"}
+    assert parse_kwargs(r'msg="say \"hi\"" n=1') == {"msg": 'say "hi"', "n": "1"}
+    assert parse_kwargs("content=") == {"content": ""}
+    assert parse_kwargs("echo hello") == {}
+    
+    print("parse_kwargs test passed!")
+
+def test_format_size():
+    """Test human-readable size formatting"""
+    print("Testing format_size...")
+    
+    assert format_size(0) == "0 B"
+    assert format_size(1023) == "1023 B"
+    assert format_size(1536) == "1.50 KB"
+    assert format_size(5 * 1024 ** 3) == "5.00 GB"
+    
+    print("format_size test passed!")
+
+def test_event_ring():
+    """Test the flight-recorder event ring"""
+    print("Testing event ring...")
+    
+    ring_path = "test_events.ring"
+    ring = RingEventLogger(ring_path, slot_size=256, slot_count=4)
+    try:
+        for i in range(6):
+            assert ring.log("trace", "Test", f"step {i}")
+        assert not ring.log("trace", "Test", "too big", message="x" * 300)
+        
+        # Only the newest slot_count events survive
+        events, last_seq, lost = read_ring(ring_path)
+        assert [e["action"] for e in events] == ["step 2", "step 3", "step 4", "step 5"]
+        assert (last_seq, lost) == (6, 2)
+        assert read_ring(ring_path, last_seq) == ([], 6, 0)
+        
+        # Unencodable metadata is stringified instead of failing
+        assert ring.log("trace", "Test", "odd metadata", metadata={"obj": object()})
+        
+        # A tailer notices the ring being recreated and starts over
+        ring.close()
+        ring = RingEventLogger(ring_path, slot_size=256, slot_count=8)
+        ring.log("trace", "Test", "restarted")
+        assert [e["action"] for e in read_ring(ring_path, 7)[0]] == ["restarted"]
+    finally:
+        ring.close()
+        os.remove(ring_path)
+    
+    print("Event ring test passed!")
+
 def run_tests():
     """Run all tests"""
     print("=== Running MCP System Tests ===")
@@ -146,6 +267,11 @@ def run_tests():
         test_tool_creation()
         test_controller_setup()
         test_file_tool()
+        test_command_tool_safety()
+        test_code_agent_detection()
+        test_parse_kwargs()
+        test_format_size()
+        test_event_ring()
         
         print("\n✅ All tests passed! The MCP system is working correctly.")
     except Exception as e:
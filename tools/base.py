@@ -2,46 +2,80 @@
 Enhanced Tool Base Module
 Provides an improved base class for all MCP tools with additional capabilities
 """
-from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Deque, Awaitable
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import functools
+import itertools
 import uuid
 import logging
+import os
+import threading
+import time
 from datetime import datetime
 
 # Configure logging
 logger = logging.getLogger('mcp.tools')
 
+# Worker threads shared by every tool that runs synchronous code from async callers
+TOOL_POOL_SIZE = int(os.getenv("MCP_TOOL_POOL_SIZE", "32"))
+
+_tool_executor: Optional[ThreadPoolExecutor] = None
+_tool_executor_lock = threading.Lock()
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    """Get the thread pool shared by all tools, creating it on first use"""
+    global _tool_executor
+    if _tool_executor is None:
+        with _tool_executor_lock:
+            if _tool_executor is None:
+                _tool_executor = ThreadPoolExecutor(max_workers=TOOL_POOL_SIZE,
+                                                    thread_name_prefix="mcp-tool")
+    return _tool_executor
+
 class ToolMetadata:
     """Metadata for tool capabilities and requirements"""
     
+    __slots__ = ("name", "description", "version", "parameters", "required_permissions",
+                 "supports_progress", "tags", "_dict_cache", "_required_permissions_set")
+    
     def __init__(self, 
                  name: str,
                  description: str,
                  version: str = "1.0.0",
-                 parameters: Dict[str, Dict[str, Any]] = None,
-                 required_permissions: List[str] = None,
+                 parameters: Optional[Dict[str, Dict[str, Any]]] = None,
+                 required_permissions: Optional[List[str]] = None,
                  supports_progress: bool = False,
-                 tags: List[str] = None):
+                 tags: Optional[List[str]] = None) -> None:
         self.name = name
         self.description = description
         self.version = version
         self.parameters = parameters or {}
         self.required_permissions = required_permissions or []
+        self._required_permissions_set = frozenset(self.required_permissions)
         self.supports_progress = supports_progress
         self.tags = tags or []
+        self._dict_cache: Optional[Dict[str, Any]] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert metadata to dictionary"""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "version": self.version,
-            "parameters": self.parameters,
-            "required_permissions": self.required_permissions,
-            "supports_progress": self.supports_progress,
-            "tags": self.tags
-        }
+        """
+        Convert metadata to dictionary
+        
+        Metadata does not change after a tool is initialized, so the dict is
+        built once and the same instance is returned on later calls.
+        """
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "name": self.name,
+                "description": self.description,
+                "version": self.version,
+                "parameters": self.parameters,
+                "required_permissions": self.required_permissions,
+                "supports_progress": self.supports_progress,
+                "tags": self.tags
+            }
+        return self._dict_cache
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ToolMetadata':
@@ -60,7 +94,9 @@ class ToolMetadata:
 class ProgressTracker:
     """Track progress of long-running operations"""
     
-    def __init__(self, total_steps: int = 100):
+    __slots__ = ("total_steps", "current_step", "status_message", "callbacks")
+    
+    def __init__(self, total_steps: int = 100) -> None:
         self.total_steps = total_steps
         self.current_step = 0
         self.status_message = ""
@@ -89,10 +125,27 @@ class ProgressTracker:
         return (self.current_step / self.total_steps) * 100
 
 
-class Tool(ABC):
+class _NullProgressTracker(ProgressTracker):
+    """Progress tracker that ignores updates, shared when nobody is listening"""
+    
+    __slots__ = ()
+    
+    def update(self, step: int, message: str = "") -> None:
+        pass
+    
+    def add_callback(self, callback: Callable[[int, str], None]) -> None:
+        pass
+
+
+NULL_PROGRESS_TRACKER = _NullProgressTracker()
+
+
+class Tool:
     """
     Enhanced base tool with improved capabilities
     
+    Subclasses must implement _initialize_metadata and _execute.
+    
     - Metadata for discovery and requirements
     - Asynchronous operation support
     - Structured error handling
@@ -100,34 +153,49 @@ class Tool(ABC):
     - Permission requirements
     """
     
-    def __init__(self):
+    __slots__ = ("id", "metadata", "permissions_checked", "execution_history",
+                 "_history_by_id", "max_history_size", "_exec_counter")
+    
+    # Whether the class provides a native _execute_async, set per subclass
+    _has_async_impl = False
+    _execute_async: Callable[..., Awaitable[Any]]
+    
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._has_async_impl = callable(getattr(cls, '_execute_async', None))
+    
+    def __init__(self) -> None:
         self.id = str(uuid.uuid4())
+        # Execution ids are this tool's id plus a per-tool sequence number
+        self._exec_counter = itertools.count(1)
         self.metadata = self._initialize_metadata()
         self.permissions_checked = False
-        self.execution_history: List[Dict[str, Any]] = []
         self.max_history_size = 50
+        # Oldest records drop off once the history is full
+        self.execution_history: Deque[Dict[str, Any]] = deque(maxlen=self.max_history_size)
+        self._history_by_id: Dict[str, Dict[str, Any]] = {}  # execution id -> record in history
     
-    @abstractmethod
     def _initialize_metadata(self) -> ToolMetadata:
         """Initialize tool metadata"""
-        pass
+        raise NotImplementedError(f"{type(self).__name__} must implement _initialize_metadata")
     
     def check_permissions(self, granted_permissions: List[str]) -> bool:
         """Check if all required permissions are available"""
-        missing_permissions = []
-        
-        for permission in self.metadata.required_permissions:
-            if permission not in granted_permissions:
-                missing_permissions.append(permission)
-        
-        if missing_permissions:
-            logger.warning(f"Tool {self.metadata.name} is missing required permissions: {', '.join(missing_permissions)}")
-            return False
+        required = self.metadata._required_permissions_set
+        if required:
+            missing = required.difference(granted_permissions)
+            if missing:
+                if logger.isEnabledFor(logging.WARNING):
+                    # Report in declaration order
+                    missing_permissions = [p for p in self.metadata.required_permissions if p in missing]
+                    logger.warning("Tool %s is missing required permissions: %s",
+                                   self.metadata.name, ", ".join(missing_permissions))
+                return False
         
         self.permissions_checked = True
         return True
     
-    def execute(self, **kwargs) -> Any:
+    def execute(self, **kwargs: Any) -> Any:
         """
         Execute the tool synchronously
         
@@ -135,10 +203,10 @@ class Tool(ABC):
         error handling and execution logging.
         """
         # Create execution record
-        execution_id = str(uuid.uuid4())
-        execution_record = {
+        execution_id = f"{self.id}:{next(self._exec_counter)}"
+        execution_record: Dict[str, Any] = {
             "id": execution_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time_ns(),
             "parameters": kwargs,
             "status": "started"
         }
@@ -147,11 +215,9 @@ class Tool(ABC):
         self._add_to_history(execution_record)
         
         try:
-            # Create progress tracker if supported
-            progress_tracker = None
+            # Callers that want progress pass their own tracker; others get a no-op one
             if self.metadata.supports_progress:
-                progress_tracker = ProgressTracker()
-                kwargs['progress_tracker'] = progress_tracker
+                kwargs.setdefault('progress_tracker', NULL_PROGRESS_TRACKER)
             
             # Execute tool logic
             result = self._execute(**kwargs)
@@ -159,23 +225,22 @@ class Tool(ABC):
             # Update execution record
             execution_record["status"] = "completed"
             execution_record["result"] = str(result) if result is not None else None
-            execution_record["completed_at"] = datetime.now().isoformat()
+            execution_record["completed_at"] = time.time_ns()
             self._update_history_record(execution_id, execution_record)
             
             return result
         except Exception as e:
-            error_msg = f"Error in tool {self.metadata.name}: {str(e)}"
-            logger.error(error_msg)
+            logger.error("Error in tool %s: %s", self.metadata.name, e)
             
             # Update execution record with error
             execution_record["status"] = "failed"
             execution_record["error"] = str(e)
-            execution_record["completed_at"] = datetime.now().isoformat()
+            execution_record["completed_at"] = time.time_ns()
             self._update_history_record(execution_id, execution_record)
             
             raise
     
-    async def execute_async(self, **kwargs) -> Any:
+    async def execute_async(self, **kwargs: Any) -> Any:
         """
         Execute the tool asynchronously
         
@@ -183,10 +248,10 @@ class Tool(ABC):
         error handling and execution logging.
         """
         # Create execution record
-        execution_id = str(uuid.uuid4())
-        execution_record = {
+        execution_id = f"{self.id}:{next(self._exec_counter)}"
+        execution_record: Dict[str, Any] = {
             "id": execution_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.time_ns(),
             "parameters": kwargs,
             "status": "started"
         }
@@ -195,63 +260,81 @@ class Tool(ABC):
         self._add_to_history(execution_record)
         
         try:
-            # Create progress tracker if supported
-            progress_tracker = None
+            # Callers that want progress pass their own tracker; others get a no-op one
             if self.metadata.supports_progress:
-                progress_tracker = ProgressTracker()
-                kwargs['progress_tracker'] = progress_tracker
+                kwargs.setdefault('progress_tracker', NULL_PROGRESS_TRACKER)
             
             # Check if tool implements async execution
-            if hasattr(self, '_execute_async') and callable(getattr(self, '_execute_async')):
+            if self._has_async_impl:
                 result = await self._execute_async(**kwargs)
             else:
                 # Fall back to synchronous execution in a thread
-                loop = asyncio.get_event_loop()
-                result = await loop.run_in_executor(None, lambda: self._execute(**kwargs))
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(get_tool_executor(),
+                                                    functools.partial(self._execute, **kwargs))
             
             # Update execution record
             execution_record["status"] = "completed"
             execution_record["result"] = str(result) if result is not None else None
-            execution_record["completed_at"] = datetime.now().isoformat()
+            execution_record["completed_at"] = time.time_ns()
             self._update_history_record(execution_id, execution_record)
             
             return result
         except Exception as e:
-            error_msg = f"Error in tool {self.metadata.name}: {str(e)}"
-            logger.error(error_msg)
+            logger.error("Error in tool %s: %s", self.metadata.name, e)
             
             # Update execution record with error
             execution_record["status"] = "failed"
             execution_record["error"] = str(e)
-            execution_record["completed_at"] = datetime.now().isoformat()
+            execution_record["completed_at"] = time.time_ns()
             self._update_history_record(execution_id, execution_record)
             
             raise
     
     def _add_to_history(self, record: Dict[str, Any]) -> None:
         """Add execution record to history"""
-        self.execution_history.append(record)
-        
-        # Keep history at a reasonable size
-        if len(self.execution_history) > self.max_history_size:
-            self.execution_history.pop(0)
+        history = self.execution_history
+        if len(history) == history.maxlen:
+            # The deque is about to drop its oldest record
+            self._history_by_id.pop(history[0]["id"], None)
+        history.append(record)
+        self._history_by_id[record["id"]] = record
+    
+    def get_history(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the most recent execution records with ISO formatted timestamps"""
+        if limit <= 0:
+            return []
+        records = list(self.execution_history)[-limit:]
+        return [self._format_record(r) for r in records]
+    
+    @staticmethod
+    def _format_record(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a copy of an execution record with ISO formatted timestamps"""
+        formatted = dict(record)
+        for key in ("timestamp", "completed_at"):
+            if key in formatted:
+                formatted[key] = datetime.fromtimestamp(formatted[key] / 1e9).isoformat()
+        return formatted
     
     def _update_history_record(self, execution_id: str, updated_record: Dict[str, Any]) -> None:
         """Update an existing history record"""
-        for i, record in enumerate(self.execution_history):
-            if record.get("id") == execution_id:
-                self.execution_history[i] = updated_record
-                break
+        existing = self._history_by_id.get(execution_id)
+        if existing is not None and existing is not updated_record:
+            # Update in place so the entry in the history deque stays current
+            existing.clear()
+            existing.update(updated_record)
     
-    @abstractmethod
-    def _execute(self, **kwargs) -> Any:
+    def _execute(self, **kwargs: Any) -> Any:
         """
         Execute tool logic
         
         This is the main method that tools should implement to process input
         and return results.
         """
-        pass
+        raise NotImplementedError(f"{type(self).__name__} must implement _execute")
+    
+    def close(self) -> None:
+        """Release resources held by the tool; called by the controller on shutdown"""
     
     def get_parameter_schema(self) -> Dict[str, Dict[str, Any]]:
         """Get parameter schema for the tool"""
@@ -1,19 +1,92 @@
+import asyncio
+import functools
 import subprocess
 import platform
+import re
 import shlex
 import logging
+from typing import Any, List, Optional, Tuple
 from tools.base import Tool, ToolMetadata
 from utils.logger import log_event
 
 # Configure logging
 logger = logging.getLogger('mcp.tools.command')
 
+# Commands that are never run, matched against each token's program name
+_BANNED = frozenset({"rm", "del", "rmdir", "deltree", "rd", "format",
+                     "mkfs", "shutdown", "reboot", "halt", "poweroff"})
+
+# Path separators stripped before matching
+_PATH_SEP_RE = re.compile(r"[\\/]")
+
+# Whitespace and shell metacharacters that can start another command inside a token
+_SUB_TOKEN_RE = re.compile(r"[\s;&|<>()`]+")
+
+# Quote and escape characters a shell removes from a word, deleted before matching
+_UNQUOTE_TABLE = str.maketrans("", "", "\"'^")
+
+# Shells whose command-line payload is screened like a command of its own
+_SHELLS = frozenset({"sh", "bash", "dash", "zsh", "ksh", "cmd", "powershell", "pwsh"})
+
+# Shell options that take a command string: -c (and combined forms like -lc), /c, /k, -command
+_SHELL_COMMAND_FLAG_RE = re.compile(r"-[a-z]*c|/[ck]|-command", re.IGNORECASE)
+
+_IS_WINDOWS = platform.system().lower() == "windows"
+
+# Characters that make shlex parsing differ from a plain whitespace split
+_SHLEX_SPECIAL = frozenset("\"'\\")
+
+# Seconds a command may run before it is killed
+COMMAND_TIMEOUT = 10
+
+@functools.lru_cache(maxsize=1024)
+def _command_name(token: str) -> str:
+    """
+    Reduce a token to the command name it could invoke
+
+    Drops any directory and everything from the first dot, so '/bin/RM',
+    'format.com' and 'mkfs.ext4' become 'rm', 'format' and 'mkfs'.
+    """
+    name = _PATH_SEP_RE.split(token)[-1].lower()
+    return name.split(".", 1)[0]
+
+def _tokenize(raw_input: str) -> List[str]:
+    """Split a command line into tokens, using shlex only when it is quoted or escaped"""
+    if _SHLEX_SPECIAL.isdisjoint(raw_input):
+        # Nothing quoted or escaped, so shlex would give the same tokens
+        return raw_input.split()
+    try:
+        return shlex.split(raw_input)
+    except ValueError:
+        return raw_input.split()
+
+def _is_banned(tokens: List[str]) -> bool:
+    """
+    Check whether tokens could run a banned command
+
+    Every token is also split on whitespace and shell metacharacters, so a
+    command chained with '&' or hidden in a quoted argument is found, and
+    each piece is matched by exact name so words like 'formatting' pass.
+    The command string given to a shell with -c or /c is tokenized and
+    screened again.
+    """
+    for i, token in enumerate(tokens):
+        names = [_command_name(part)
+                 for part in _SUB_TOKEN_RE.split(token.translate(_UNQUOTE_TABLE)) if part]
+        if not _BANNED.isdisjoint(names):
+            return True
+        if (names and names[-1] in _SHELLS and i + 2 < len(tokens)
+                and _SHELL_COMMAND_FLAG_RE.fullmatch(tokens[i + 1])
+                and _is_banned(_tokenize(" ".join(tokens[i + 2:])))):
+            return True
+    return False
+
 class CommandTool(Tool):
     """
     Tool for executing system commands
     """
     
-    def __init__(self):
+    def __init__(self) -> None:
         super().__init__()
     
     def _initialize_metadata(self) -> ToolMetadata:
@@ -33,54 +106,102 @@ class CommandTool(Tool):
             tags=["system", "command", "shell"]
         )
     
-    def _execute(self, **kwargs) -> str:
+    def _execute(self, **kwargs: Any) -> str:
         """Execute a system command"""
-        raw_input = kwargs.get("raw_input")
-        
-        if not raw_input:
-            result = "[CommandTool] No 'raw_input' provided."
-            logger.warning(result)
-            log_event("CommandTool", "None", result)
+        raw_input: str = kwargs.get("raw_input") or ""
+        result, tokens = self._screen(raw_input)
+        if result is not None:
             return result
 
-        # Security check - block dangerous commands
-        banned = {"rm", "del", "rmdir", "deltree", "rd", "format", 
-                 "mkfs", "shutdown", "reboot", "halt", "poweroff"}
-
+        # The screened tokens run as an argument list, so commands with
+        # arguments (including a shell's -c payload) really execute; _screen
+        # must clear every token, not just the program name
         try:
-            tokens = shlex.split(raw_input)
-        except ValueError:
-            tokens = raw_input.lower().split()
-
-        if any(banned_cmd in token.lower() for token in tokens for banned_cmd in banned):
-            result = "[CommandTool] Command blocked for safety."
-            logger.warning(f"[CommandTool] Blocked command: {raw_input}")
-            log_event("CommandTool", raw_input, result)
-            return result
-
-        try:
-            is_windows = platform.system().lower() == "windows"
             result_obj = subprocess.run(
-                raw_input,
-                shell=is_windows,
+                raw_input if _IS_WINDOWS else tokens,
+                shell=_IS_WINDOWS,
                 capture_output=True,
-                text=True,
-                timeout=10  # Add timeout for safety
+                timeout=COMMAND_TIMEOUT  # Add timeout for safety
             )
+            result = self._format_output(raw_input, result_obj.returncode,
+                                         result_obj.stdout, result_obj.stderr)
+
+        except subprocess.TimeoutExpired:
+            result = f"[CommandTool] Command timed out after {COMMAND_TIMEOUT} seconds."
+            logger.warning("[CommandTool] Command timeout: %s", raw_input)
+        except Exception as e:
+            result = f"[CommandTool] Error: {str(e)}"
+            logger.error("[CommandTool] Exception: %s", e)
+
+        log_event("CommandTool", raw_input, result)
+        return result
+
+    async def _execute_async(self, **kwargs: Any) -> str:
+        """Execute a system command as an asyncio subprocess"""
+        raw_input: str = kwargs.get("raw_input") or ""
+        result, tokens = self._screen(raw_input)
+        if result is not None:
+            return result
 
-            if result_obj.returncode != 0:
-                result = f"[CommandTool] Error:\n{result_obj.stderr.strip()}"
-                logger.error(f"[CommandTool] Command failed: {raw_input}")
+        try:
+            if _IS_WINDOWS:
+                process = await asyncio.create_subprocess_shell(
+                    raw_input, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
             else:
-                result = result_obj.stdout.strip()
-                logger.info(f"[CommandTool] Successfully executed: {raw_input}")
+                process = await asyncio.create_subprocess_exec(
+                    *tokens, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
 
-        except subprocess.TimeoutExpired:
-            result = "[CommandTool] Command timed out after 10 seconds."
-            logger.warning(f"[CommandTool] Command timeout: {raw_input}")
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=COMMAND_TIMEOUT)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise
+            # communicate() has reaped the child; wait() just returns its exit code
+            returncode = await process.wait()
+            result = self._format_output(raw_input, returncode, stdout, stderr)
+
+        except asyncio.TimeoutError:
+            result = f"[CommandTool] Command timed out after {COMMAND_TIMEOUT} seconds."
+            logger.warning("[CommandTool] Command timeout: %s", raw_input)
         except Exception as e:
             result = f"[CommandTool] Error: {str(e)}"
-            logger.error(f"[CommandTool] Exception: {str(e)}")
+            logger.error("[CommandTool] Exception: %s", e)
 
         log_event("CommandTool", raw_input, result)
         return result
+
+    def _screen(self, raw_input: str) -> Tuple[Optional[str], List[str]]:
+        """
+        Tokenize a command and apply the safety checks
+
+        Returns:
+            (result, tokens) where result is the message to return instead of
+            running the command, or None if the command may run
+        """
+        if not raw_input:
+            result = "[CommandTool] No 'raw_input' provided."
+            logger.warning(result)
+            log_event("CommandTool", "None", result)
+            return result, []
+
+        # Security check - block dangerous commands
+        tokens = _tokenize(raw_input)
+        if _is_banned(tokens):
+            result = "[CommandTool] Command blocked for safety."
+            logger.warning("[CommandTool] Blocked command: %s", raw_input)
+            log_event("CommandTool", raw_input, result)
+            return result, tokens
+
+        return None, tokens
+
+    def _format_output(self, raw_input: str, returncode: int, stdout: bytes, stderr: bytes) -> str:
+        """Turn a finished command's exit status and output into the tool result"""
+        # Output is captured as bytes and decoded once
+        if returncode != 0:
+            stderr_text = stderr.decode("utf-8", errors="replace").strip()
+            logger.error("[CommandTool] Command failed: %s", raw_input)
+            return f"[CommandTool] Error:\n{stderr_text}"
+
+        logger.info("[CommandTool] Successfully executed: %s", raw_input)
+        return stdout.decode("utf-8", errors="replace").strip()
@@ -1,19 +1,78 @@
+import errno
+import fnmatch
+import mmap
 import os
+import re
 import shutil
+import stat
 import glob
 import json
 import asyncio
-from typing import Dict, List, Any, Optional
+import functools
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from tools.base import Tool, ToolMetadata
+from utils.helpers import format_size
 from utils.logger import log_event
 
+try:
+    import aiofiles
+    AIOFILES_AVAILABLE = True
+except ImportError:
+    AIOFILES_AVAILABLE = False
+
 # Configure logging
 logger = logging.getLogger('mcp.tools.file')
 
+# Files up to this size are read with raw os calls; larger ones are memory mapped
+SMALL_FILE_LIMIT = 1024 * 1024
+
+# Characters of text encoded and written per chunk for large payloads
+WRITE_CHUNK_SIZE = 1024 * 1024
+
+# Bytes requested per os.copy_file_range call (Linux only)
+COPY_CHUNK_SIZE = 1 << 30
+COPY_FILE_RANGE_AVAILABLE = hasattr(os, "copy_file_range")
+
+# copy_file_range errors that mean "not supported here" rather than a real failure
+_COPY_FALLBACK_ERRNOS = frozenset({errno.EXDEV, errno.ENOSYS, errno.EINVAL,
+                                   errno.EOPNOTSUPP, errno.EBADF, errno.EPERM})
+
+# Wildcard patterns match case-insensitively where the filesystem does
+_PATTERN_FLAGS = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+
+@functools.lru_cache(maxsize=128)
+def _compile_glob(pattern: str) -> Callable[[str], Optional[re.Match]]:
+    """Compile one wildcard path component to a regex match function, once per pattern"""
+    return re.compile(fnmatch.translate(pattern), _PATTERN_FLAGS).match
+
+# O_BINARY keeps Windows from translating line endings on raw descriptors
+_O_BINARY = getattr(os, "O_BINARY", 0)
+
+# Marks an action parameter that has no default
+_REQUIRED = object()
+
+# Worker threads for blocking file operations; file I/O gains little from a wide pool
+FILE_POOL_SIZE = int(os.getenv("MCP_FILE_POOL_SIZE", "8"))
+
+_file_executor: Optional[ThreadPoolExecutor] = None
+_file_executor_lock = threading.Lock()
+
+def get_file_executor() -> ThreadPoolExecutor:
+    """Get the thread pool shared by FileTool instances, creating it on first use"""
+    global _file_executor
+    if _file_executor is None:
+        with _file_executor_lock:
+            if _file_executor is None:
+                _file_executor = ThreadPoolExecutor(max_workers=FILE_POOL_SIZE,
+                                                    thread_name_prefix="mcp-file")
+    return _file_executor
+
 class FileTool(Tool):
     """
     Enhanced File Tool with improved capabilities
@@ -25,8 +84,36 @@ class FileTool(Tool):
     - File monitoring
     """
     
-    def __init__(self):
+    # action -> (handler, aiofiles handler or None, (parameter, default) pairs passed after path)
+    _ACTIONS: Dict[str, Tuple[str, Optional[str], Tuple[Tuple[str, Any], ...]]] = {
+        "read": ("_read_file", "_read_file_async", ()),
+        "write": ("_write_file", "_write_file_async", (("content", ""),)),
+        "write_batch": ("_write_batch", "_write_batch_async", (("files", _REQUIRED), ("make_dirs", True))),
+        "append": ("_append_file", "_append_file_async", (("content", ""),)),
+        "delete": ("_delete_file_or_dir", None, (("recursive", False),)),
+        "list": ("_list_directory", None, ()),
+        "create_dir": ("_create_directory", None, ()),
+        "copy": ("_copy_file_or_dir", None, (("destination", _REQUIRED),)),
+        "move": ("_move_file_or_dir", None, (("destination", _REQUIRED),)),
+        "search": ("_search_files", None, (("pattern", "*"),)),
+        "info": ("_get_file_info", None, ()),
+    }
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Args:
+            max_workers: Give this tool its own pool of this many threads
+                instead of sharing the module pool (e.g. a larger one for NFS)
+        """
         super().__init__()
+        self._executor = (ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-file")
+                          if max_workers else None)
+    
+    def close(self) -> None:
+        """Shut down this tool's own thread pool; later calls use the shared pool"""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
     
     def _initialize_metadata(self) -> ToolMetadata:
         """Initialize tool metadata"""
@@ -59,6 +146,16 @@ class FileTool(Tool):
                     "type": "string",
                     "description": "Search pattern for file operations",
                     "required": False
+                },
+                "files": {
+                    "type": "object",
+                    "description": "Mapping of file name (relative to path) to content for write_batch",
+                    "required": False
+                },
+                "make_dirs": {
+                    "type": "boolean",
+                    "description": "Whether write_batch creates missing directories (default true)",
+                    "required": False
                 }
             },
             required_permissions=["file_access"],
@@ -75,49 +172,11 @@ class FileTool(Tool):
             return "[FileTool] Error: Both 'action' and 'path' parameters are required"
         
         try:
-            # Route to appropriate handler based on action
-            if action == "read":
-                return self._read_file(path)
-            
-            elif action == "write":
-                content = kwargs.get("content", "")
-                return self._write_file(path, content)
-            
-            elif action == "append":
-                content = kwargs.get("content", "")
-                return self._append_file(path, content)
-            
-            elif action == "delete":
-                recursive = kwargs.get("recursive", False)
-                return self._delete_file_or_dir(path, recursive)
-            
-            elif action == "list":
-                return self._list_directory(path)
-            
-            elif action == "create_dir":
-                return self._create_directory(path)
-            
-            elif action == "copy":
-                destination = kwargs.get("destination")
-                if not destination:
-                    return "[FileTool] Error: 'destination' parameter is required for copy action"
-                return self._copy_file_or_dir(path, destination)
-            
-            elif action == "move":
-                destination = kwargs.get("destination")
-                if not destination:
-                    return "[FileTool] Error: 'destination' parameter is required for move action"
-                return self._move_file_or_dir(path, destination)
-            
-            elif action == "search":
-                pattern = kwargs.get("pattern", "*")
-                return self._search_files(path, pattern)
-            
-            elif action == "info":
-                return self._get_file_info(path)
-            
-            else:
-                return f"[FileTool] Error: Unknown action '{action}'"
+            resolved = self._resolve_action(action, kwargs)
+            if isinstance(resolved, str):
+                return resolved
+            handler_name, _, args = resolved
+            return getattr(self, handler_name)(path, *args)
         
         except Exception as e:
             logger.error(f"[FileTool] Error performing {action} on {path}: {str(e)}")
@@ -133,97 +192,263 @@ class FileTool(Tool):
             return "[FileTool] Error: Both 'action' and 'path' parameters are required"
         
         try:
-            # Create loop for running file operations in thread
-            loop = asyncio.get_event_loop()
-            
-            # Route to appropriate handler based on action
-            if action == "read":
-                return await loop.run_in_executor(None, lambda: self._read_file(path))
-            
-            elif action == "write":
-                content = kwargs.get("content", "")
-                return await loop.run_in_executor(None, lambda: self._write_file(path, content))
-            
-            elif action == "append":
-                content = kwargs.get("content", "")
-                return await loop.run_in_executor(None, lambda: self._append_file(path, content))
-            
-            elif action == "delete":
-                recursive = kwargs.get("recursive", False)
-                return await loop.run_in_executor(None, lambda: self._delete_file_or_dir(path, recursive))
-            
-            elif action == "list":
-                return await loop.run_in_executor(None, lambda: self._list_directory(path))
-            
-            elif action == "create_dir":
-                return await loop.run_in_executor(None, lambda: self._create_directory(path))
-            
-            elif action == "copy":
-                destination = kwargs.get("destination")
-                if not destination:
-                    return "[FileTool] Error: 'destination' parameter is required for copy action"
-                return await loop.run_in_executor(None, lambda: self._copy_file_or_dir(path, destination))
-            
-            elif action == "move":
-                destination = kwargs.get("destination")
-                if not destination:
-                    return "[FileTool] Error: 'destination' parameter is required for move action"
-                return await loop.run_in_executor(None, lambda: self._move_file_or_dir(path, destination))
-            
-            elif action == "search":
-                pattern = kwargs.get("pattern", "*")
-                return await loop.run_in_executor(None, lambda: self._search_files(path, pattern))
+            resolved = self._resolve_action(action, kwargs)
+            if isinstance(resolved, str):
+                return resolved
+            handler_name, async_handler_name, args = resolved
             
-            elif action == "info":
-                return await loop.run_in_executor(None, lambda: self._get_file_info(path))
+            if async_handler_name and AIOFILES_AVAILABLE:
+                return await getattr(self, async_handler_name)(path, *args)
             
-            else:
-                return f"[FileTool] Error: Unknown action '{action}'"
+            # Run the blocking handler in a thread
+            loop = asyncio.get_running_loop()
+            handler = functools.partial(getattr(self, handler_name), path, *args)
+            return await loop.run_in_executor(self._executor or get_file_executor(), handler)
         
         except Exception as e:
             logger.error(f"[FileTool] Error performing {action} on {path}: {str(e)}")
             log_event("FileTool", f"{action} {path}", f"Error: {str(e)}")
             return f"[FileTool] Error: {str(e)}"
     
+    def _resolve_action(self, action: str, kwargs: Dict[str, Any]) -> Union[str, Tuple[str, Optional[str], List[Any]]]:
+        """
+        Look up the handlers and arguments for an action
+        
+        Returns (handler name, aiofiles handler name or None, arguments after
+        path), or an error message if the action is unknown or a required
+        parameter is missing.
+        """
+        spec = self._ACTIONS.get(action)
+        if spec is None:
+            return f"[FileTool] Error: Unknown action '{action}'"
+        
+        handler_name, async_handler_name, params = spec
+        args = []
+        for name, default in params:
+            value = kwargs.get(name, default)
+            if default is _REQUIRED and (value is _REQUIRED or not value):
+                return f"[FileTool] Error: '{name}' parameter is required for {action} action"
+            args.append(value)
+        return handler_name, async_handler_name, args
+    
     # Implementation of file operations
     def _read_file(self, path: str) -> str:
         """Read content from a file"""
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                result = f.read()
+            result = self._read_small_text(path)
+            if result is None:
+                result = self._read_mapped_text(path)
             logger.info(f"[FileTool] Read from {path}")
             log_event("FileTool", f"read {path}", "Success")
             return result
         except UnicodeDecodeError:
-            # Try binary mode if text mode fails
-            with open(path, "rb") as f:
-                result = f.read()
+            # Not text; report the size without reading the data
+            size = os.path.getsize(path)
             logger.info(f"[FileTool] Read binary data from {path}")
             log_event("FileTool", f"read {path}", "Binary data")
-            return f"[Binary data of size {len(result)} bytes]"
+            return f"[Binary data of size {size} bytes]"
     
     def _write_file(self, path: str, content: str) -> str:
         """Write content to a file, creating directories if needed"""
-        # Ensure directory exists
-        directory = os.path.dirname(path)
-        if directory and not os.path.exists(directory):
-            os.makedirs(directory, exist_ok=True)
+        self._ensure_parent(path)
         
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
+        self._write_text(path, content)
         logger.info(f"[FileTool] Wrote to {path}")
         log_event("FileTool", f"write {path}", "Success")
         return f"[FileTool] Successfully wrote to {path}"
     
-    def _append_file(self, path: str, content: str) -> str:
-        """Append content to a file, creating it if needed"""
-        # Ensure directory exists
-        directory = os.path.dirname(path)
+    def _write_batch(self, base: str, files: Dict[str, str], make_dirs: bool = True) -> str:
+        """
+        Write several files under a base directory in one call
+        
+        The files are written concurrently on the file pool. When already on
+        a pool thread (an async call without aiofiles) they are written in
+        turn, so a batch never waits on the pool it occupies. Pass make_dirs
+        False when the caller has created the directories already.
+        """
+        if make_dirs:
+            for directory in {os.path.dirname(os.path.join(base, name)) for name in files}:
+                self._ensure_dir(directory)
+        
+        def write_one(item: Tuple[str, str]) -> None:
+            self._write_text(os.path.join(base, item[0]), item[1])
+        
+        if len(files) > 1 and not threading.current_thread().name.startswith("mcp-file"):
+            # list() waits for every write and re-raises the first error
+            list((self._executor or get_file_executor()).map(write_one, files.items()))
+        else:
+            for item in files.items():
+                write_one(item)
+        
+        logger.info(f"[FileTool] Wrote {len(files)} files to {base}")
+        log_event("FileTool", f"write_batch {base} n={len(files)}", "Success")
+        return f"[FileTool] Successfully wrote {len(files)} files to {base}"
+    
+    async def _write_batch_async(self, base: str, files: Dict[str, str], make_dirs: bool = True) -> str:
+        """Write several files under a base directory concurrently with aiofiles"""
+        async def write_one(name: str, content: str) -> None:
+            async with self._aio_open(os.path.join(base, name), "w") as f:
+                await self._write_chunks_async(f, content)
+        
+        if make_dirs:
+            for directory in {os.path.dirname(os.path.join(base, name)) for name in files}:
+                self._ensure_dir(directory)
+        await asyncio.gather(*(write_one(name, content) for name, content in files.items()))
+        
+        logger.info(f"[FileTool] Wrote {len(files)} files to {base}")
+        log_event("FileTool", f"write_batch {base} n={len(files)}", "Success")
+        return f"[FileTool] Successfully wrote {len(files)} files to {base}"
+    
+    def _write_text(self, path: str, content: str, append: bool = False) -> None:
+        """
+        Write text to a file with raw os calls
+        
+        Large content is encoded and written WRITE_CHUNK_SIZE characters at a
+        time, so the whole payload is never held twice in memory.
+        """
+        flags = os.O_WRONLY | os.O_CREAT | _O_BINARY
+        flags |= os.O_APPEND if append else os.O_TRUNC
+        fd = os.open(path, flags, 0o666)
+        try:
+            for start in range(0, len(content), WRITE_CHUNK_SIZE):
+                view = memoryview(self._encode_text(content[start:start + WRITE_CHUNK_SIZE]))
+                while view:
+                    view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+    
+    async def _read_file_async(self, path: str) -> str:
+        """Read content from a file with aiofiles"""
+        try:
+            async with self._aio_open(path, "r") as f:
+                result = await f.read()
+            logger.info(f"[FileTool] Read from {path}")
+            log_event("FileTool", f"read {path}", "Success")
+            return result
+        except UnicodeDecodeError:
+            # Not text; report the size without reading the data
+            size = os.path.getsize(path)
+            logger.info(f"[FileTool] Read binary data from {path}")
+            log_event("FileTool", f"read {path}", "Binary data")
+            return f"[Binary data of size {size} bytes]"
+    
+    async def _write_file_async(self, path: str, content: str) -> str:
+        """Write content to a file with aiofiles"""
+        return await self._write_text_async(path, content, "w")
+    
+    async def _append_file_async(self, path: str, content: str) -> str:
+        """Append content to a file with aiofiles"""
+        return await self._write_text_async(path, content, "a")
+    
+    async def _write_text_async(self, path: str, content: str, mode: str) -> str:
+        """Write ('w') or append ('a') content with aiofiles, creating directories if needed"""
+        self._ensure_parent(path)
+        
+        async with self._aio_open(path, mode) as f:
+            await self._write_chunks_async(f, content)
+        
+        verb, past = ("append", "Appended") if mode == "a" else ("write", "Wrote")
+        logger.info(f"[FileTool] {past} to {path}")
+        log_event("FileTool", f"{verb} {path}", "Success")
+        return f"[FileTool] Successfully {past.lower()} to {path}"
+    
+    @classmethod
+    def _ensure_parent(cls, path: str) -> None:
+        """Create the directory that will hold path, if it does not exist yet"""
+        cls._ensure_dir(os.path.dirname(path))
+    
+    @staticmethod
+    def _ensure_dir(directory: str) -> None:
+        """
+        Create a directory and its parents, if it does not exist yet
+        
+        The exists check is one stat in the usual case where the directory is
+        already there; makedirs alone would stat and fail a mkdir. exist_ok
+        covers a directory created by someone else in between.
+        """
         if directory and not os.path.exists(directory):
             os.makedirs(directory, exist_ok=True)
+    
+    def _aio_open(self, path: str, mode: str) -> Any:
+        """Open a text file with aiofiles, running its blocking calls on the file pool"""
+        return aiofiles.open(path, mode, encoding="utf-8",
+                             executor=self._executor or get_file_executor())
+    
+    @staticmethod
+    async def _write_chunks_async(f: Any, content: str) -> None:
+        """Write text to an aiofiles handle WRITE_CHUNK_SIZE characters at a time"""
+        for start in range(0, len(content), WRITE_CHUNK_SIZE):
+            await f.write(content[start:start + WRITE_CHUNK_SIZE])
+    
+    @staticmethod
+    def _read_small_text(path: str) -> Optional[str]:
+        """
+        Read a small UTF-8 file straight from its descriptor
+        
+        Skips the buffered text I/O stack for the common small-file case.
+        Returns None for files over SMALL_FILE_LIMIT so the caller can fall
+        back to open(). Line endings are normalized like text mode does.
+        """
+        fd = os.open(path, os.O_RDONLY | _O_BINARY)
+        try:
+            size = os.fstat(fd).st_size
+            if size > SMALL_FILE_LIMIT:
+                return None
+            chunks = []
+            remaining = size
+            while remaining > 0:
+                chunk = os.read(fd, remaining)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+        finally:
+            os.close(fd)
+        
+        data = b"".join(chunks)
+        text = data.decode("utf-8")
+        if b"\r" in data:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+    
+    @staticmethod
+    def _read_mapped_text(path: str) -> str:
+        """
+        Read a large UTF-8 file through a read-only memory map
+        
+        The text is decoded straight from the mapped pages, so the file
+        contents are never copied into an intermediate bytes object.
+        """
+        fd = os.open(path, os.O_RDONLY | _O_BINARY)
+        try:
+            if os.fstat(fd).st_size == 0:
+                # mmap rejects empty files
+                return ""
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                with memoryview(mm) as view:
+                    text = str(view, "utf-8")
+                has_cr = mm.find(b"\r") != -1
+        finally:
+            os.close(fd)
         
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(content)
+        if has_cr:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+    
+    @staticmethod
+    def _encode_text(content: str) -> bytes:
+        """Encode text for writing, translating newlines like text mode does"""
+        if os.linesep != "\n":
+            content = content.replace("\n", os.linesep)
+        return content.encode("utf-8")
+    
+    def _append_file(self, path: str, content: str) -> str:
+        """Append content to a file, creating it if needed"""
+        self._ensure_parent(path)
+        
+        self._write_text(path, content, append=True)
         logger.info(f"[FileTool] Appended to {path}")
         log_event("FileTool", f"append {path}", "Success")
         return f"[FileTool] Successfully appended to {path}"
@@ -254,22 +479,14 @@ class FileTool(Tool):
         if not os.path.isdir(path):
             return f"[FileTool] Error: {path} is not a directory"
         
-        items = os.listdir(path)
-        files = []
-        directories = []
+        # DirEntry.is_dir() uses the type returned with the listing, so no stat per entry
+        with os.scandir(path) as it:
+            entries = [(not entry.is_dir(), entry.name) for entry in it]
         
-        for item in items:
-            item_path = os.path.join(path, item)
-            if os.path.isdir(item_path):
-                directories.append(f"[DIR] {item}")
-            else:
-                files.append(f"[FILE] {item}")
+        # Directories first, then files, each sorted by name
+        entries.sort()
         
-        # Sort directories and files separately
-        directories.sort()
-        files.sort()
-        
-        result = "\n".join(directories + files)
+        result = "\n".join(("[FILE] " if is_file else "[DIR] ") + name for is_file, name in entries)
         logger.info(f"[FileTool] Listed directory {path}")
         log_event("FileTool", f"list {path}", "Success")
         return f"Directory content of {path}:\n{result}"
@@ -284,32 +501,61 @@ class FileTool(Tool):
     def _copy_file_or_dir(self, source: str, destination: str) -> str:
         """Copy a file or directory"""
         if os.path.isfile(source):
-            # Ensure destination directory exists
-            dest_dir = os.path.dirname(destination)
-            if dest_dir and not os.path.exists(dest_dir):
-                os.makedirs(dest_dir, exist_ok=True)
+            self._ensure_parent(destination)
             
-            shutil.copy2(source, destination)
+            self._copy_file(source, destination)
             logger.info(f"[FileTool] Copied file {source} to {destination}")
             log_event("FileTool", f"copy {source} to {destination}", "Success")
             return f"[FileTool] Successfully copied file {source} to {destination}"
         elif os.path.isdir(source):
-            shutil.copytree(source, destination)
+            shutil.copytree(source, destination, copy_function=self._copy_file)
             logger.info(f"[FileTool] Copied directory {source} to {destination}")
             log_event("FileTool", f"copy {source} to {destination}", "Success")
             return f"[FileTool] Successfully copied directory {source} to {destination}"
         else:
             return f"[FileTool] Error: {source} does not exist"
     
+    @staticmethod
+    def _copy_file(source: str, destination: str) -> str:
+        """
+        Copy a file and its metadata like shutil.copy2
+        
+        On Linux the data is copied in the kernel with os.copy_file_range,
+        which filesystems that support reflinks can do without copying any
+        data at all. Anywhere that is unsupported, or where the kernel copies
+        fewer bytes than the source's size, shutil.copy2 is used.
+        """
+        if COPY_FILE_RANGE_AVAILABLE:
+            if os.path.isdir(destination):
+                destination = os.path.join(destination, os.path.basename(source))
+            if os.path.exists(destination) and os.path.samefile(source, destination):
+                raise shutil.SameFileError(f"{source!r} and {destination!r} are the same file")
+            try:
+                with open(source, "rb") as fsrc, open(destination, "wb") as fdst:
+                    src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+                    copied = 0
+                    while True:
+                        n = os.copy_file_range(src_fd, dst_fd, COPY_CHUNK_SIZE)
+                        if not n:
+                            break
+                        copied += n
+                    # procfs/sysfs-style files report a size but give the kernel copy nothing
+                    complete = copied >= os.fstat(src_fd).st_size
+            except OSError as e:
+                if e.errno not in _COPY_FALLBACK_ERRNOS:
+                    raise
+            else:
+                if complete:
+                    shutil.copystat(source, destination)
+                    return destination
+        return shutil.copy2(source, destination)
+    
     def _move_file_or_dir(self, source: str, destination: str) -> str:
         """Move a file or directory"""
         if not os.path.exists(source):
             return f"[FileTool] Error: {source} does not exist"
         
-        # Ensure destination directory exists
-        dest_dir = os.path.dirname(destination)
-        if dest_dir and not os.path.exists(dest_dir):
-            os.makedirs(dest_dir, exist_ok=True)
+        self._ensure_parent(destination)
         
         shutil.move(source, destination)
         logger.info(f"[FileTool] Moved {source} to {destination}")
@@ -321,8 +567,10 @@ class FileTool(Tool):
         if not os.path.isdir(path):
             return f"[FileTool] Error: {path} is not a directory"
         
-        search_path = os.path.join(path, "**", pattern)
-        matches = glob.glob(search_path, recursive=True)
+        if "**" in pattern or os.path.isabs(pattern):
+            matches = glob.glob(os.path.join(path, "**", pattern), recursive=True)
+        else:
+            matches = self._walk_matches(path, pattern)
         
         if not matches:
             return f"[FileTool] No files matching '{pattern}' found in {path}"
@@ -333,13 +581,73 @@ class FileTool(Tool):
         log_event("FileTool", f"search {path} {pattern}", f"Found {len(matches)} matches")
         return f"Found {len(matches)} files matching '{pattern}' in {path}:\n{result}"
     
+    @staticmethod
+    def _walk_matches(path: str, pattern: str) -> List[str]:
+        """
+        Find paths under path matching pattern at any depth
+        
+        Equivalent to glob(path/**/pattern) for patterns without '**': hidden
+        names only match components that start with '.', and symlinked
+        directories are followed. A symlinked directory is entered once per
+        target, so link cycles end instead of recursing forever. Compiled
+        pattern components are reused across searches.
+        """
+        parts = [p for p in re.split(r"[\\/]", pattern) if p]
+        if not parts:
+            return []
+        matchers = [_compile_glob(p) for p in parts]
+        hidden_ok = [p.startswith(".") for p in parts]
+        # Hidden directories only need scanning if the pattern can match inside one
+        walk_hidden = any(hidden_ok[:-1])
+        n = len(parts)
+        
+        matches = []
+        stack = [(path, ())]
+        # (st_dev, st_ino) of the symlinked directories already entered
+        linked_dirs = set()
+        while stack:
+            directory, rel = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            
+            subdirs = []
+            for entry in entries:
+                name = entry.name
+                entry_rel = rel + (name,)
+                if len(entry_rel) >= n:
+                    tail = entry_rel[-n:]
+                    if all(hidden_ok[i] or not tail[i].startswith(".") for i in range(n)) \
+                            and all(matchers[i](tail[i]) for i in range(n)) \
+                            and not any(p.startswith(".") for p in entry_rel[:-n]):
+                        matches.append(entry.path)
+                if not walk_hidden and name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append((entry.path, entry_rel))
+                elif entry.is_symlink() and entry.is_dir():
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    key = (st.st_dev, st.st_ino)
+                    if key not in linked_dirs:
+                        linked_dirs.add(key)
+                        subdirs.append((entry.path, entry_rel))
+            # Reverse so the stack visits subdirectories in name order
+            stack.extend(reversed(subdirs))
+        return matches
+    
     def _get_file_info(self, path: str) -> str:
         """Get detailed information about a file or directory"""
-        if not os.path.exists(path):
+        # One stat answers existence, type and the details below
+        try:
+            stats = os.stat(path)
+        except FileNotFoundError:
             return f"[FileTool] Error: {path} does not exist"
-        
-        stats = os.stat(path)
-        is_dir = os.path.isdir(path)
+        is_dir = stat.S_ISDIR(stats.st_mode)
         
         # Format timestamps
         created_time = datetime.fromtimestamp(stats.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
@@ -348,7 +656,7 @@ class FileTool(Tool):
         
         # Calculate human-readable size
         size_bytes = stats.st_size
-        size_readable = self._format_size(size_bytes)
+        size_readable = format_size(size_bytes)
         
         info = {
             "path": path,
@@ -363,10 +671,17 @@ class FileTool(Tool):
         
         # Add directory-specific info
         if is_dir:
-            items = os.listdir(path)
-            info["items_count"] = len(items)
-            info["files_count"] = sum(1 for item in items if os.path.isfile(os.path.join(path, item)))
-            info["dirs_count"] = sum(1 for item in items if os.path.isdir(os.path.join(path, item)))
+            items_count = files_count = dirs_count = 0
+            with os.scandir(path) as it:
+                for entry in it:
+                    items_count += 1
+                    if entry.is_file():
+                        files_count += 1
+                    elif entry.is_dir():
+                        dirs_count += 1
+            info["items_count"] = items_count
+            info["files_count"] = files_count
+            info["dirs_count"] = dirs_count
         
         # Format as string
         result = [f"Information for: {path}"]
@@ -383,10 +698,3 @@ class FileTool(Tool):
         logger.info(f"[FileTool] Got info for {path}")
         log_event("FileTool", f"info {path}", "Success")
         return "\n".join(result)
-    
-    def _format_size(self, size_bytes: int) -> str:
-        """Format bytes as human-readable size"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024 or unit == 'TB':
-                return f"{size_bytes:.2f} {unit}" if unit != 'B' else f"{size_bytes} {unit}"
-            size_bytes /= 1024
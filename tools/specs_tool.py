@@ -1,6 +1,9 @@
+import functools
 import platform
 import logging
+import time
 from tools.base import Tool, ToolMetadata
+from utils.helpers import format_size
 from utils.logger import log_event
 
 # Configure logging
@@ -13,6 +16,29 @@ except ImportError:
     PSUTIL_AVAILABLE = False
     logger.warning("psutil not installed - some functionality will be limited")
 
+# Seconds a gathered section is reused before it is read from the system again
+SPECS_CACHE_TTL = 5.0
+
+@functools.lru_cache(maxsize=None)
+def _static_info():
+    """
+    System details that cannot change while the process runs, read once
+    
+    platform.processor() can spawn a subprocess, so none of these are worth
+    querying more than once.
+    """
+    return {
+        "processor": platform.processor(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "release": platform.release(),
+        "version": platform.version(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "phys_cores": psutil.cpu_count(logical=False) if PSUTIL_AVAILABLE else None,
+        "log_cores": psutil.cpu_count() if PSUTIL_AVAILABLE else None,
+    }
+
 class SpecsTool(Tool):
     """
     Tool for retrieving system specifications and resource information
@@ -20,6 +46,11 @@ class SpecsTool(Tool):
     
     def __init__(self):
         super().__init__()
+        # (section, detailed) -> (monotonic time gathered, text)
+        self._cache = {}
+        if PSUTIL_AVAILABLE:
+            # Prime the counters so later cpu_percent calls need not sleep
+            psutil.cpu_percent(interval=None)
     
     def _initialize_metadata(self) -> ToolMetadata:
         """Initialize tool metadata"""
@@ -53,14 +84,8 @@ class SpecsTool(Tool):
             if not PSUTIL_AVAILABLE and info_type in ["cpu", "ram", "disk", "all"]:
                 return "[SpecsTool] Error: psutil module not installed. Please install with 'pip install psutil' for full functionality."
                 
-            if info_type == "cpu":
-                result = self._get_cpu_info(detailed)
-            elif info_type == "ram":
-                result = self._get_ram_info(detailed)
-            elif info_type == "disk":
-                result = self._get_disk_info(detailed)
-            elif info_type == "os":
-                result = self._get_os_info(detailed)
+            if info_type in ("cpu", "ram", "disk", "os"):
+                result = self._get_section(info_type, detailed)
             elif info_type == "all":
                 result = self._get_all_info(detailed)
             else:
@@ -76,25 +101,38 @@ class SpecsTool(Tool):
             log_event("SpecsTool", f"info_type={info_type}", f"Error: {str(e)}")
             return error_msg
     
+    def _get_section(self, section: str, detailed: bool) -> str:
+        """Get one section of system information, reusing it for SPECS_CACHE_TTL seconds"""
+        key = (section, detailed)
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None and now - cached[0] < SPECS_CACHE_TTL:
+            return cached[1]
+        
+        result = getattr(self, f"_get_{section}_info")(detailed)
+        self._cache[key] = (now, result)
+        return result
+    
     def _get_cpu_info(self, detailed: bool) -> str:
         """Get CPU information"""
+        static = _static_info()
         if not PSUTIL_AVAILABLE:
-            return f"CPU: {platform.processor()}, Architecture: {platform.machine()}"
+            return f"CPU: {static['processor']}, Architecture: {static['machine']}"
             
         if detailed:
             cpu_freq = psutil.cpu_freq()
             cpu_freq_str = f", Frequency: {cpu_freq.current:.2f} MHz" if cpu_freq else ""
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            cpu_percent = psutil.cpu_percent(interval=None)
             
             result = (
-                f"CPU: {platform.processor()}\n"
-                f"Architecture: {platform.machine()}\n"
-                f"Physical cores: {psutil.cpu_count(logical=False)}\n"
-                f"Logical cores: {psutil.cpu_count()}{cpu_freq_str}\n"
+                f"CPU: {static['processor']}\n"
+                f"Architecture: {static['machine']}\n"
+                f"Physical cores: {static['phys_cores']}\n"
+                f"Logical cores: {static['log_cores']}{cpu_freq_str}\n"
                 f"Current usage: {cpu_percent}%"
             )
         else:
-            result = f"CPU: {platform.processor()}, Cores: {psutil.cpu_count(logical=False)}, Threads: {psutil.cpu_count()}"
+            result = f"CPU: {static['processor']}, Cores: {static['phys_cores']}, Threads: {static['log_cores']}"
         
         return result
     
@@ -107,10 +145,10 @@ class SpecsTool(Tool):
         
         if detailed:
             result = (
-                f"Total RAM: {self._format_bytes(mem.total)}\n"
-                f"Available: {self._format_bytes(mem.available)} ({mem.percent}% used)\n"
-                f"Used: {self._format_bytes(mem.used)}\n"
-                f"Free: {self._format_bytes(mem.free)}"
+                f"Total RAM: {format_size(mem.total)}\n"
+                f"Available: {format_size(mem.available)} ({mem.percent}% used)\n"
+                f"Used: {format_size(mem.used)}\n"
+                f"Free: {format_size(mem.free)}"
             )
         else:
             result = f"RAM: {round(mem.total / (1024**3), 2)} GB total, {round(mem.available / (1024**3), 2)} GB available"
@@ -130,9 +168,9 @@ class SpecsTool(Tool):
                     result.append(
                         f"Partition: {part.mountpoint} ({part.device})\n"
                         f"  Filesystem: {part.fstype}\n"
-                        f"  Total: {self._format_bytes(usage.total)}\n"
-                        f"  Used: {self._format_bytes(usage.used)} ({usage.percent}%)\n"
-                        f"  Free: {self._format_bytes(usage.free)}"
+                        f"  Total: {format_size(usage.total)}\n"
+                        f"  Used: {format_size(usage.used)} ({usage.percent}%)\n"
+                        f"  Free: {format_size(usage.free)}"
                     )
             return "\n".join(result)
         else:
@@ -141,38 +179,32 @@ class SpecsTool(Tool):
     
     def _get_os_info(self, detailed: bool) -> str:
         """Get operating system information"""
+        static = _static_info()
         if detailed:
             result = (
-                f"OS: {platform.system()} {platform.release()}\n"
-                f"Version: {platform.version()}\n"
-                f"Platform: {platform.platform()}\n"
-                f"Python: {platform.python_version()}"
+                f"OS: {static['system']} {static['release']}\n"
+                f"Version: {static['version']}\n"
+                f"Platform: {static['platform']}\n"
+                f"Python: {static['python']}"
             )
         else:
-            result = f"OS: {platform.system()} {platform.release()}"
+            result = f"OS: {static['system']} {static['release']}"
         
         return result
     
     def _get_all_info(self, detailed: bool) -> str:
         """Get all system information"""
         sections = [
-            self._get_os_info(detailed),
-            self._get_cpu_info(detailed),
+            self._get_section("os", detailed),
+            self._get_section("cpu", detailed),
         ]
         
         if PSUTIL_AVAILABLE:
             sections.extend([
-                self._get_ram_info(detailed),
-                self._get_disk_info(detailed)
+                self._get_section("ram", detailed),
+                self._get_section("disk", detailed)
             ])
         else:
             sections.append("Note: Install psutil for RAM and disk information")
         
         return "\n\n".join(sections)
-    
-    def _format_bytes(self, bytes: int) -> str:
-        """Format bytes as human-readable size"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if bytes < 1024 or unit == 'TB':
-                return f"{bytes:.2f} {unit}" if unit != 'B' else f"{bytes} {unit}"
-            bytes /= 1024
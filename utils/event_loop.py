@@ -0,0 +1,80 @@
+"""
+Event Loop Utilities
+Helpers for configuring the asyncio event loop used by the MCP runtime
+"""
+import asyncio
+import logging
+import sys
+from typing import Any, Coroutine
+
+# Configure logging
+logger = logging.getLogger('mcp.utils.event_loop')
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+# asyncio.run accepts a loop_factory from Python 3.12
+LOOP_FACTORY_SUPPORTED = sys.version_info >= (3, 12)
+
+def install_uvloop() -> bool:
+    """
+    Install uvloop as the asyncio event loop policy if it is available
+
+    Must be called before the event loop is created (i.e. before
+    asyncio.run or get_event_loop in the entry point). On Python 3.12+
+    the global policy is left alone and run_event_loop passes uvloop as
+    the loop factory instead.
+
+    Returns:
+        True if uvloop was installed, False if the default loop is used
+    """
+    if not UVLOOP_AVAILABLE:
+        logger.debug("uvloop not installed - using default asyncio event loop")
+        return False
+
+    if not LOOP_FACTORY_SUPPORTED:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.info("Using uvloop event loop")
+    return True
+
+def run_event_loop(main: Coroutine[Any, Any, Any]) -> Any:
+    """
+    Run a coroutine to completion on a new event loop
+
+    Uses uvloop when it is installed, without touching the global event
+    loop policy on Python versions that support a loop factory.
+
+    Args:
+        main: The coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    if UVLOOP_AVAILABLE and LOOP_FACTORY_SUPPORTED:
+        return asyncio.run(main, loop_factory=uvloop.new_event_loop)
+    return asyncio.run(main)
+
+def enable_eager_tasks(loop: asyncio.AbstractEventLoop) -> bool:
+    """
+    Install the eager task factory on a loop (Python 3.12+)
+
+    With eager tasks, coroutines that finish without suspending complete
+    inline in create_task instead of waiting for the next loop iteration.
+    On older Python versions the loop keeps the default task factory.
+
+    Args:
+        loop: The event loop to configure
+
+    Returns:
+        True if the eager task factory was installed, False otherwise
+    """
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is None:
+        logger.debug("Eager task factory requires Python 3.12+ - using default task factory")
+        return False
+
+    loop.set_task_factory(eager_task_factory)
+    return True
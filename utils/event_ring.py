@@ -0,0 +1,192 @@
+"""
+Event Ring
+Flight-recorder event log kept in a memory-mapped ring of fixed-size slots
+
+Writers never block on disk I/O and old events are overwritten once the ring
+is full. Other processes read the ring by mapping the same file, e.g.:
+
+    python -m utils.event_ring events.ring
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import json_utils
+
+# File header: magic, slot size, slot count, last written sequence number, dropped records
+_HEADER = struct.Struct("<8sIIQQ")
+_HEADER_SIZE = 64
+_MAGIC = b"MCPRING1"
+
+# Offset of the write sequence number within the header
+_WRITE_SEQ_OFFSET = 16
+_SEQ = struct.Struct("<Q")
+
+# Slot header: sequence number (0 while the slot is being written), payload length
+_SLOT = struct.Struct("<QI")
+
+DEFAULT_SLOT_SIZE = 1024
+DEFAULT_SLOT_COUNT = 4096
+
+class RingEventLogger:
+    """
+    Structured event logger that writes into a memory-mapped ring buffer
+
+    Meant for high-volume trace events where EventLogger's durable JSONL file
+    would be too costly. Each event takes one slot; an event whose JSON does
+    not fit in a slot is dropped and counted in the header.
+    """
+
+    def __init__(self, path: str = "events.ring",
+                 slot_size: int = DEFAULT_SLOT_SIZE,
+                 slot_count: int = DEFAULT_SLOT_COUNT):
+        self.path = path
+        self.slot_size = slot_size
+        self.slot_count = slot_count
+        self._lock = threading.Lock()
+
+        # Ensure directory exists
+        log_dir = os.path.dirname(path)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
+
+        size = _HEADER_SIZE + slot_size * slot_count
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            existing = os.fstat(fd).st_size
+            if existing != size:
+                os.ftruncate(fd, 0)
+                os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        magic, file_slot_size, file_slot_count, write_seq, dropped = _HEADER.unpack_from(self._mm, 0)
+        if (magic, file_slot_size, file_slot_count) != (_MAGIC, slot_size, slot_count):
+            # New file or different geometry: start an empty ring
+            write_seq = dropped = 0
+            self._mm[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+            _HEADER.pack_into(self._mm, 0, _MAGIC, slot_size, slot_count, 0, 0)
+        self._seq = write_seq
+        self._dropped = dropped
+
+    def log(self,
+            event_type: str,
+            source: str,
+            action: str,
+            metadata: Optional[Dict[str, Any]] = None,
+            status: str = "success",
+            message: Optional[str] = None) -> bool:
+        """
+        Record an event in the ring
+
+        Takes the same arguments as EventLogger.log. Returns False if the
+        event was too large for a slot and was dropped.
+        """
+        event = {
+            "timestamp": time.time(),
+            "event_type": event_type,
+            "source": source,
+            "action": action,
+            "status": status
+        }
+
+        if metadata:
+            event["metadata"] = metadata
+
+        if message:
+            event["message"] = message
+
+        try:
+            payload = json_utils.dumps(event).encode("utf-8")
+        except (TypeError, ValueError):
+            # Like EventLogger, keep the event with its metadata stringified
+            event["metadata"] = repr(metadata)
+            payload = json_utils.dumps(event).encode("utf-8")
+        if len(payload) > self.slot_size - _SLOT.size:
+            with self._lock:
+                self._dropped += 1
+                _HEADER.pack_into(self._mm, 0, _MAGIC, self.slot_size, self.slot_count,
+                                  self._seq, self._dropped)
+            return False
+
+        mm = self._mm
+        with self._lock:
+            seq = self._seq + 1
+            offset = _HEADER_SIZE + (seq % self.slot_count) * self.slot_size
+            # Mark the slot as in progress so readers never accept a half-written record
+            _SLOT.pack_into(mm, offset, 0, 0)
+            start = offset + _SLOT.size
+            mm[start:start + len(payload)] = payload
+            _SLOT.pack_into(mm, offset, seq, len(payload))
+            _SEQ.pack_into(mm, _WRITE_SEQ_OFFSET, seq)
+            self._seq = seq
+        return True
+
+    def close(self) -> None:
+        """Unmap the ring file"""
+        with self._lock:
+            if not self._mm.closed:
+                self._mm.close()
+
+
+def read_ring(path: str, after_seq: int = 0) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Read the events a ring file holds after a sequence number
+
+    Returns (events, last sequence number seen, events lost). Events are lost
+    when they were overwritten before being read, or were being rewritten
+    while this call copied them. If the ring's sequence is behind after_seq,
+    the file was recreated, so reading starts again from its beginning.
+    """
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with mm:
+        magic, slot_size, slot_count, write_seq, _ = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not an event ring file")
+        if write_seq < after_seq:
+            after_seq = 0
+
+        events = []
+        lost = 0
+        first = max(after_seq + 1, write_seq - slot_count + 1)
+        lost += first - (after_seq + 1)
+        for seq in range(first, write_seq + 1):
+            offset = _HEADER_SIZE + (seq % slot_count) * slot_size
+            slot_seq, length = _SLOT.unpack_from(mm, offset)
+            start = offset + _SLOT.size
+            payload = mm[start:start + length]
+            # The slot must still hold the same record after the copy
+            if slot_seq != seq or _SLOT.unpack_from(mm, offset)[0] != seq:
+                lost += 1
+                continue
+            events.append(json_utils.loads(payload))
+        return events, write_seq, lost
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print events from a ring file as JSON lines, following new ones"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Tail an MCP event ring file")
+    parser.add_argument("path", help="Ring file written by RingEventLogger")
+    parser.add_argument("--interval", type=float, default=0.2, help="Seconds between polls")
+    args = parser.parse_args(argv)
+
+    last_seq = 0
+    try:
+        while True:
+            events, last_seq, lost = read_ring(args.path, last_seq)
+            if lost:
+                print(f"# {lost} events lost", flush=True)
+            for event in events:
+                print(json_utils.dumps(event), flush=True)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
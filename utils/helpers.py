@@ -1,3 +1,16 @@
+import functools
+import re
+
+# Units for format_size, each 1024 times the previous
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+# Matches key=value pairs where the value is double-quoted (with backslash
+# escapes), single-quoted or a bare word
+_KV_RE = re.compile(r'''(?:^|(?<=\s))([^\s=]+)=(?:"((?:[^"\\]|\\.)*)"|'([^']*)'|(\S*))''', re.DOTALL)
+
+# Backslash escapes a shell honours inside double quotes
+_DQ_ESCAPE_RE = re.compile(r'\\([\\"$`])')
+
 def parse_kwargs(arg_string):
     """
     Parses 'key=value' strings into a dictionary of kwargs.
@@ -5,17 +18,32 @@ def parse_kwargs(arg_string):
         'action=write path=test.txt content="Hello world"' ->
         {'action': 'write', 'path': 'test.txt', 'content': 'Hello world'}
     """
-    import shlex
-    import re
+    return dict(_parse_pairs(arg_string))
 
-    # Use shlex to split while respecting quotes
-    tokens = shlex.split(arg_string)
-    kwargs = {}
+@functools.lru_cache(maxsize=256)
+def _parse_pairs(arg_string):
+    """Parse an argument string into (key, value) pairs, cached for repeated strings"""
+    pairs = []
+    for match in _KV_RE.finditer(arg_string):
+        key, double_quoted, single_quoted, bare = match.groups()
+        if double_quoted is not None:
+            value = _DQ_ESCAPE_RE.sub(r"\1", double_quoted) if "\\" in double_quoted else double_quoted
+        elif single_quoted is not None:
+            value = single_quoted
+        else:
+            value = bare
+        pairs.append((key, value))
+    return tuple(pairs)
 
-    for token in tokens:
-        if '=' in token:
-            key, value = token.split('=', 1)
-            # Remove quotes manually if present
-            value = re.sub(r'^["\']|["\']$', '', value)
-            kwargs[key] = value
-    return kwargs
+def format_size(size_bytes):
+    """
+    Formats a byte count as a human-readable size.
+    Example:
+        1536 -> '1.50 KB', 512 -> '512 B'
+    """
+    size_bytes = int(size_bytes)
+    # Each unit covers 10 more bits, so the bit length picks the unit directly
+    unit = min(len(_SIZE_UNITS) - 1, max(0, (size_bytes.bit_length() - 1) // 10))
+    if unit == 0:
+        return f"{size_bytes} B"
+    return f"{size_bytes / (1 << (10 * unit)):.2f} {_SIZE_UNITS[unit]}"
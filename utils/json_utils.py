@@ -0,0 +1,36 @@
+"""
+JSON Utilities
+Fast JSON encoding/decoding using orjson when available, falling back to the stdlib
+"""
+import json
+import logging
+from typing import Any, Union
+
+# Configure logging
+logger = logging.getLogger('mcp.utils.json')
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.debug("orjson not installed - using stdlib json")
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON document from a string or bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """
+    Serialize an object to a JSON string
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with a two-space indent
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    return json.dumps(obj, indent=2 if indent else None)
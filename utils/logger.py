@@ -1,32 +1,349 @@
-import datetime
+import atexit
 import logging
+import logging.handlers
 import os
-import json
-from typing import Dict, Any, Optional
+import queue
+import threading
+import time
+from typing import Dict, Any, Optional, Union
+
+from utils import json_utils
 
 # Default log file path
 DEFAULT_LOG_PATH = "mcp.log"
 
+# Set MCP_DISABLE_EVENT_FILE=1 to stop log_event and EventLogger writing event lines
+EVENT_FILE_ENABLED = os.getenv("MCP_DISABLE_EVENT_FILE") != "1"
+
+# Characters of an event result kept in the log line
+LOG_RESULT_LIMIT = 100
+
+# (epoch second, "%Y-%m-%d %H:%M:%S" text, ISO text up to the seconds) for the last second formatted
+_ts_cache = (-1, "", "")
+
+def _timestamp_parts():
+    """
+    Return (seconds text, ISO seconds text, microseconds) for the current time
+    
+    The formatted strings only change once per second, so they are cached and
+    rebuilt from time.localtime when the second rolls over. The cache is one
+    tuple swapped in a single assignment, so threads never see a torn value.
+    """
+    global _ts_cache
+    sec, rem = divmod(time.time_ns(), 1_000_000_000)
+    cache = _ts_cache
+    if cache[0] != sec:
+        local = time.localtime(sec)
+        cache = _ts_cache = (sec, time.strftime("%Y-%m-%d %H:%M:%S", local),
+                             time.strftime("%Y-%m-%dT%H:%M:%S", local))
+    return cache[1], cache[2], rem // 1000
+
 # Configure logger
 logger = logging.getLogger('mcp')
 
-def setup_logging(level=logging.INFO, log_file=None, console=True):
+# Whether setup_logging's file handler writes to DEFAULT_LOG_PATH, so log_event
+# lines can go through it instead of a second writer on the same file
+_event_lines_via_logger = False
+
+# Log directories already created or found, so each is checked only once
+_ensured_dirs = set()
+
+def _ensure_parent_dir(path):
+    """Create the directory a log file goes in, once per directory"""
+    log_dir = os.path.dirname(path)
+    if log_dir and log_dir not in _ensured_dirs:
+        os.makedirs(log_dir, exist_ok=True)
+        _ensured_dirs.add(log_dir)
+
+class _FileFormatter(logging.Formatter):
+    """
+    Formatter for the log file's '[time] [name] [level] message' lines
+    
+    log_event records are written as their legacy event line. Plain records
+    are built with one f-string and a time string cached per second, instead
+    of the template and formatTime; records with exception or stack details
+    go through the standard formatting.
+    """
+    
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt, datefmt)
+        # (epoch second, formatted time) of the last record
+        self._last_second = (-1, "")
+    
+    def format(self, record):
+        event_line = getattr(record, "event_line", None)
+        if event_line is not None:
+            return event_line
+        if record.exc_info or record.exc_text or record.stack_info:
+            return super().format(record)
+        
+        second = int(record.created)
+        cached = self._last_second
+        if cached[0] != second:
+            cached = self._last_second = (second, time.strftime("%Y-%m-%d %H:%M:%S", self.converter(second)))
+        return f"[{cached[1]}] [{record.name}] [{record.levelname}] {record.getMessage()}"
+
+class _BufferedFileHandler(logging.FileHandler):
+    """
+    FileHandler that writes through a large buffer and flushes once per burst
+    
+    The file is opened on the first record. Records are flushed when the queue
+    feeding the handler has drained, or straight away for errors, instead of
+    after every record.
+    """
+    
+    def __init__(self, filename, buffer_size=65536, pending=None):
+        self.buffer_size = buffer_size
+        self.pending = pending
+        self._flush_now = True
+        super().__init__(filename, delay=True)
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record):
+        self._flush_now = (record.levelno >= logging.ERROR or self.pending is None
+                           or self.pending.empty())
+        super().emit(record)
+    
+    def flush(self):
+        # StreamHandler.emit flushes after every record; skip it mid-burst
+        if self._flush_now:
+            super().flush()
+        self._flush_now = True
+
+# Background listener that writes queued records to the real handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+def _stop_queue_listener():
+    """Flush and stop the background log listener, closing its handlers"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        for handler in _queue_listener.handlers:
+            handler.close()
+        _queue_listener = None
+
+atexit.register(_stop_queue_listener)
+
+# Records a syncing sink may write before it syncs, however recent they are
+SYNC_EVERY_RECORDS = 64
+
+# fdatasync skips metadata-only updates; not every platform has it
+_datasync = getattr(os, "fdatasync", os.fsync)
+
+class _SyncRequest(threading.Event):
+    """Sink marker set once earlier lines are written and synced to disk"""
+
+class _AsyncSink:
+    """
+    Appends text lines to one file from a background thread
+    
+    Callers only put lines on a queue. The writer thread keeps the file open,
+    joins everything waiting into one write and flushes once per batch. If
+    sync_interval (seconds) is set, written records are also synced to disk
+    at most that long after they are written, or every SYNC_EVERY_RECORDS
+    records, with one sync covering them all.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        # Lines to write, records to write as JSON lines, None to stop, or an
+        # Event to set once earlier lines are flushed
+        self._queue: "queue.SimpleQueue[Union[str, Dict[str, Any], threading.Event, None]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.sync_interval: Optional[float] = None
+        # Set once a write error has been reported
+        self._failed = False
+    
+    def enqueue(self, line: Union[str, Dict[str, Any]]) -> None:
+        """
+        Queue a line (including its newline) for writing
+        
+        A dict is serialized to a JSON line by the writer thread instead, so
+        the caller must not change it afterwards.
+        """
+        if self._thread is None:
+            self._start()
+        self._queue.put(line)
+    
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"mcp-log-{os.path.basename(self.path)}",
+                                                daemon=True)
+                self._thread.start()
+    
+    def flush(self) -> None:
+        """Block until every line queued so far is written and flushed"""
+        self._wait(threading.Event())
+    
+    def barrier(self) -> None:
+        """Block until every line queued so far is written and synced to disk"""
+        self._wait(_SyncRequest())
+    
+    def _wait(self, done: threading.Event) -> None:
+        """Queue a marker and wait for it, giving up if the writer thread has died"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._queue.put(done)
+        while not done.wait(0.1):
+            if not thread.is_alive():
+                return
+    
+    def close(self) -> None:
+        """Write out any queued lines and stop the writer thread"""
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+    
+    def _report(self, error: OSError) -> None:
+        """Log the first write error; later lines are dropped quietly"""
+        if not self._failed:
+            self._failed = True
+            logger.error("Cannot write event log %s: %s", self.path, error)
+    
+    def _sync(self, f) -> None:
+        try:
+            _datasync(f.fileno())
+        except OSError as e:
+            self._report(e)
+    
+    def _run(self) -> None:
+        # Binary mode: each batch is encoded once here, off the callers' threads
+        try:
+            f = open(self.path, "ab", buffering=1 << 16)
+        except OSError as e:
+            # Keep draining the queue so waiters are still released
+            self._report(e)
+            f = None
+        try:
+            self._write_loop(f)
+        finally:
+            if f is not None:
+                try:
+                    f.close()
+                except OSError as e:
+                    self._report(e)
+    
+    def _write_loop(self, f) -> None:
+        unsynced = 0          # records written since the last sync
+        unsynced_since = 0.0  # monotonic time of the oldest of them
+        while True:
+            timeout = None
+            if unsynced and self.sync_interval is not None:
+                timeout = max(0.0, unsynced_since + self.sync_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                # Nothing more arrived within the interval; sync what is pending
+                self._sync(f)
+                unsynced = 0
+                continue
+            
+            batch = []
+            waiters = []
+            # Take everything already queued so it goes out in one write
+            while item is not None:
+                if isinstance(item, str):
+                    batch.append(item)
+                elif isinstance(item, dict):
+                    batch.append(self._json_line(item))
+                else:
+                    waiters.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch and f is not None:
+                data = "".join(batch)
+                if os.linesep != "\n":
+                    data = data.replace("\n", os.linesep)
+                try:
+                    f.write(data.encode("utf-8"))
+                    f.flush()
+                except OSError as e:
+                    self._report(e)
+                else:
+                    if not unsynced:
+                        unsynced_since = time.monotonic()
+                    unsynced += len(batch)
+            
+            # One sync covers every record written so far
+            if unsynced and (any(isinstance(w, _SyncRequest) for w in waiters)
+                             or (self.sync_interval is not None
+                                 and (item is None
+                                      or unsynced >= SYNC_EVERY_RECORDS
+                                      or time.monotonic() - unsynced_since >= self.sync_interval))):
+                self._sync(f)
+                unsynced = 0
+            for waiter in waiters:
+                waiter.set()
+            if item is None:
+                return
+
+    @staticmethod
+    def _json_line(record: Dict[str, Any]) -> str:
+        """Serialize a queued record, stringifying metadata JSON cannot encode"""
+        try:
+            return json_utils.dumps(record) + "\n"
+        except (TypeError, ValueError):
+            record = dict(record, metadata=repr(record.get("metadata")))
+            return json_utils.dumps(record) + "\n"
+
+# One sink per log file, shared by everything that appends to it
+_sinks: Dict[str, _AsyncSink] = {}
+_sinks_lock = threading.Lock()
+
+def _get_sink(path: str) -> _AsyncSink:
+    """Get the sink for a log file, creating it on first use"""
+    key = os.path.abspath(path)
+    sink = _sinks.get(key)
+    if sink is None:
+        with _sinks_lock:
+            sink = _sinks.setdefault(key, _AsyncSink(path))
+    return sink
+
+def flush_now() -> None:
+    """Block until all queued event log lines have been written to their files"""
+    for sink in list(_sinks.values()):
+        sink.flush()
+
+def _close_sinks():
+    """Write out every sink's queued lines before the interpreter exits"""
+    for sink in list(_sinks.values()):
+        sink.close()
+
+atexit.register(_close_sinks)
+
+def setup_logging(level=logging.INFO, log_file=None, console=True, buffer_size=65536):
     """
     Set up logging configuration
     
+    Records are handed to a queue and written to the file and console by a
+    background thread, so logging never blocks the calling code on I/O.
+    
     Args:
         level: Logging level (DEBUG, INFO, etc.)
         log_file: Path to log file (if None, uses DEFAULT_LOG_PATH)
         console: Whether to also log to console
+        buffer_size: Size in bytes of the log file's write buffer
     """
     logger.setLevel(level)
     
     # Remove existing handlers
+    _stop_queue_listener()
     for handler in logger.handlers[:]:
         logger.removeHandler(handler)
+        handler.close()
     
     # Create formatters
-    file_formatter = logging.Formatter(
+    file_formatter = _FileFormatter(
         '[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
@@ -42,54 +359,98 @@ def setup_logging(level=logging.INFO, log_file=None, console=True):
         file_path = DEFAULT_LOG_PATH
     
     # Ensure log directory exists
-    log_dir = os.path.dirname(file_path)
-    if log_dir and not os.path.exists(log_dir):
-        os.makedirs(log_dir, exist_ok=True)
+    _ensure_parent_dir(file_path)
+    
+    global _event_lines_via_logger
+    _event_lines_via_logger = os.path.abspath(file_path) == os.path.abspath(DEFAULT_LOG_PATH)
     
-    file_handler = logging.FileHandler(file_path)
+    log_queue = queue.Queue(-1)
+    file_handler = _BufferedFileHandler(file_path, buffer_size=buffer_size, pending=log_queue)
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    handlers = [file_handler]
     
     # Console handler (optional)
     if console:
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
     
-    logger.info(f"Logging initialized at level {logging.getLevelName(level)}")
+    # Callers only enqueue records; the listener thread does the writing
+    global _queue_listener
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+    
+    logger.info("Logging initialized at level %s", logging.getLevelName(level))
     return logger
 
-def log_event(source, action, result=None):
+def _event_line(source: str, action: str, result: Any) -> str:
+    """Format a log_event line; long results are cut at LOG_RESULT_LIMIT"""
+    timestamp = _timestamp_parts()[0]
+    if not result:
+        return f"[{timestamp}] [{source}] {action}"
+    text = result if isinstance(result, str) else str(result)
+    if len(text) > LOG_RESULT_LIMIT:
+        return f"[{timestamp}] [{source}] {action} => {text[:LOG_RESULT_LIMIT]}..."
+    return f"[{timestamp}] [{source}] {action} => {text}"
+
+def log_event(source: str, action: str, result: Any = None) -> None:
     """
     Log an event to the event log file
     
-    This is a simpler logging function for backward compatibility
+    This is a simpler logging function for backward compatibility. When
+    setup_logging writes to the same file, the event line is written once by
+    its file handler; otherwise it is appended by a background writer.
+    Nothing is formatted when both the event file and the level are off.
     """
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_line = f"[{timestamp}] [{source}] {action}"
-
-    if result:
-        log_line += f" => {result[:100]}..." if len(result) > 100 else f" => {result}"
-
-    with open(DEFAULT_LOG_PATH, "a") as f:
-        f.write(log_line + "\n")
+    level = logging.ERROR if isinstance(result, Exception) else logging.INFO
+    logger_enabled = logger.isEnabledFor(level)
+    
+    extra = None
+    if EVENT_FILE_ENABLED:
+        log_line = _event_line(source, action, result)
+        if _event_lines_via_logger and logger_enabled:
+            # One record: the file handler writes the event line, the console the summary
+            extra = {"event_line": log_line}
+        else:
+            _get_sink(DEFAULT_LOG_PATH).enqueue(log_line + "\n")
+    
+    if not logger_enabled:
+        return
     
     # Also log to structured logger
-    if isinstance(result, Exception):
-        logger.error(f"{source}: {action} - {str(result)}")
+    if level == logging.ERROR:
+        logger.error("%s: %s - %s", source, action, result, extra=extra)
     else:
-        logger.info(f"{source}: {action}")
+        logger.info("%s: %s", source, action, extra=extra)
+
+# Logger level for each EventLogger status; anything else is a warning
+_STATUS_LEVELS = {"success": logging.INFO, "failed": logging.ERROR}
 
 class EventLogger:
     """Enhanced structured event logger"""
     
-    def __init__(self, log_file="events.jsonl"):
+    def __init__(self, log_file="events.jsonl", fsync_interval_ms=None):
+        """
+        Args:
+            log_file: Path of the JSON Lines event file
+            fsync_interval_ms: If set, sync events to disk at most this many
+                milliseconds after they are written, batching the syncs
+        """
         self.log_file = log_file
+        self._file_enabled = EVENT_FILE_ENABLED
+        self._sink = _get_sink(log_file)
+        if fsync_interval_ms is not None:
+            # The sink is shared per file; the tightest interval asked for wins
+            interval = fsync_interval_ms / 1000
+            current = self._sink.sync_interval
+            self._sink.sync_interval = interval if current is None else min(current, interval)
+        # Bound once so each event skips the attribute lookups
+        self._enqueue = self._sink.enqueue
+        self._log = logger.log
         
         # Ensure directory exists
-        log_dir = os.path.dirname(log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
+        _ensure_parent_dir(log_file)
     
     def log(self, 
             event_type: str, 
@@ -109,8 +470,22 @@ class EventLogger:
             status: Status of the event ('success', 'failed', 'warning', etc.)
             message: Optional message describing the event
         """
+        level = _STATUS_LEVELS.get(status, logging.WARNING)
+        if self._file_enabled:
+            self._write_event(event_type, source, action, metadata, status, message)
+        
+        # Also log to standard logger; returns at once if the level is off
+        self._log(level, "%s.%s - %s", source, action, message or status)
+    
+    def barrier(self):
+        """Block until every event logged so far is written and synced to disk"""
+        self._sink.barrier()
+    
+    def _write_event(self, event_type, source, action, metadata, status, message):
+        """Queue one JSON Lines record for the event file"""
+        _, iso_seconds, micros = _timestamp_parts()
         event = {
-            "timestamp": datetime.datetime.now().isoformat(),
+            "timestamp": f"{iso_seconds}.{micros:06d}",
             "event_type": event_type,
             "source": source,
             "action": action,
@@ -118,20 +493,11 @@ class EventLogger:
         }
         
         if metadata:
-            event["metadata"] = metadata
+            # Shallow copy: the record is serialized later on the writer thread
+            event["metadata"] = dict(metadata)
         
         if message:
             event["message"] = message
         
-        # Write to JSON Lines file
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(event) + "\n")
-        
-        # Also log to standard logger
-        log_message = f"{source}.{action} - {message or status}"
-        if status == "success":
-            logger.info(log_message)
-        elif status == "failed":
-            logger.error(log_message)
-        else:
-            logger.warning(log_message)
+        # Write to JSON Lines file; the sink's thread does the serializing
+        self._enqueue(event)